@@ -1,86 +1,136 @@
 import os
 import sys
-import json
 import logging
 import time
-import schedule
 import random
+import uuid
+import threading
 from datetime import datetime, timedelta
-import pandas as pd
-import matplotlib.pyplot as plt
-from flask import Flask, request, jsonify, render_template
-import nltk
+from flask import Flask, Response, request, jsonify, render_template
 
 # Importar nossos módulos
 from news_fetcher import NewsFetcher
 from whatsapp_sender import WhatsAppSender
-from fake_news_detector import FakeNewsDetector
+from user_store import UserStore
+from delivery import DeliveryEngine
+from message_queue import MessageQueue
+from feed_poller import FeedPoller
+import metrics
+import profiling
+from delivery_scheduler import DeliveryScheduler, matches_frequency, parse_send_time, get_timezone
 import config
 
-# Configurar logging
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(config.DATA_DIR, "app.log")),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger("app")
 
-# Garantir que os diretórios necessários existam
-os.makedirs(config.DATA_DIR, exist_ok=True)
-os.makedirs(config.CACHE_DIR, exist_ok=True)
-
 # Inicializar o aplicativo Flask para interface web
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
-# Inicializar os objetos principais
-news_fetcher = NewsFetcher()
-whatsapp_sender = WhatsAppSender()
-fake_news_detector = FakeNewsDetector()
-
-# Arquivo com dados dos usuários
-users_file = os.path.join(config.DATA_DIR, "users.json")
-
-def load_users():
-    """Carrega lista de usuários do arquivo"""
-    if os.path.exists(users_file):
-        try:
-            with open(users_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Erro ao carregar usuários: {e}")
-            return {}
-    return {}
-
-def save_users(users):
-    """Salva lista de usuários no arquivo"""
-    try:
-        with open(users_file, 'w', encoding='utf-8') as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        logger.error(f"Erro ao salvar usuários: {e}")
-
-# Carregar lista de usuários
-users = load_users()
+# Objetos principais, criados por init_app()
+news_fetcher = None
+whatsapp_sender = None
+delivery_engine = None
+message_queue = None
+user_store = None
+users = None
+feed_poller = None
+delivery_scheduler = None
+
+# Com --profile, cada rodada de envio grava um relatório de execução em config.PROFILES_DIR
+profile_runs = False
+# Com --profile-memory, o relatório também mede o pico de memória Python (tracemalloc, mais lento)
+profile_memory = False
+
+# Espera (s) entre verificações de um broadcast cujas mensagens restantes estão com o método alternativo
+BROADCAST_POLL_SECONDS = 5
+
+def init_app():
+    """Configura o logging e cria os objetos principais (uma única vez)
+    
+    Não roda na importação: os processos de extração (iniciados com "spawn")
+    importam este módulo de novo e não podem abrir outra fila de mensagens.
+    """
+    global news_fetcher, whatsapp_sender, delivery_engine, message_queue
+    global user_store, users, feed_poller, delivery_scheduler
+    
+    if news_fetcher is not None:
+        return
+    
+    # Configurar logging
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(os.path.join(config.DATA_DIR, "app.log")),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+    
+    # Garantir que os diretórios necessários existam
+    os.makedirs(config.DATA_DIR, exist_ok=True)
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    
+    # Inicializar os objetos principais
+    news_fetcher = NewsFetcher()
+    whatsapp_sender = WhatsAppSender()
+    delivery_engine = DeliveryEngine(whatsapp_sender)
+    message_queue = MessageQueue(os.path.join(config.DATA_DIR, "outbox.db"))
+    
+    # Usuários cadastrados (users.json)
+    user_store = UserStore(os.path.join(config.DATA_DIR, "users.json"))
+    users = user_store.users
+    
+    # Leitura contínua dos feeds, com intervalo aprendido para cada um
+    feed_poller = FeedPoller(news_fetcher)
+    
+    # Agendador de envios por usuário (horário e fuso de cada um)
+    delivery_scheduler = DeliveryScheduler(users, lambda user_ids: run_job("send_daily_news", send_daily_news, user_ids))
 
 # ----- Funções Principais para Envio de Notícias -----
 
-def send_daily_news():
-    """Função principal que envia notícias diárias para todos os usuários"""
+def send_daily_news(user_ids=None):
+    """
+    Função principal que envia notícias diárias para os usuários
+    
+    Sem `user_ids`, envia para todos cujo dia de envio (frequência) é hoje; com `user_ids`,
+    envia para esses usuários, já escolhidos pelo agendador conforme horário e frequência.
+    """
     logger.info("Iniciando envio de notícias diárias...")
     
     if not users:
         logger.warning("Nenhum usuário cadastrado para receber notícias")
         return
     
-    for user_id, user_data in users.items():
+    if user_ids is None:
+        current_weekday = datetime.now().weekday()
+        selected_users = {
+            user_id: user_data for user_id, user_data in users.items()
+            if matches_frequency(user_data.get("frequency", "daily"), current_weekday)
+        }
+    else:
+        selected_users = {user_id: users[user_id] for user_id in user_ids if user_id in users}
+    
+    # Usar as notícias pré-carregadas; só as categorias que faltarem são buscadas agora
+    article_pool = get_article_pool(selected_users)
+    
+    # Mensagens já enfileiradas hoje não são montadas nem enviadas de novo
+    job_id = f"daily-{datetime.now().date().isoformat()}"
+    already_queued = message_queue.existing_keys(job_id)
+    
+    # Montar as mensagens de cada usuário; usuários com as mesmas preferências
+    # compartilham a mesma seleção de notícias e a mesma mensagem
+    messages = []
+    digests = {}
+    for user_id, user_data in selected_users.items():
         if not user_data.get("active", True):
             logger.info(f"Usuário {user_id} está inativo, pulando...")
             continue
         
+        dedupe_key = f"{job_id}:{user_id}"
+        if dedupe_key in already_queued:
+            logger.info(f"Notícias de hoje do usuário {user_id} já foram enfileiradas, pulando...")
+            continue
+        
         try:
             # Obter preferências do usuário
             user_phone = user_data.get("phone")
@@ -88,57 +138,106 @@ def send_daily_news():
                 logger.warning(f"Usuário {user_id} não tem telefone cadastrado")
                 continue
             
-            # Verificar frequência de envio do usuário
-            send_frequency = user_data.get("frequency", "daily")
-            current_day = datetime.now().strftime("%A").lower()
-            
-            # Pular usuário se a frequência não corresponder ao dia atual
-            if send_frequency == "weekly" and current_day != "monday":
-                continue
-            elif send_frequency == "biweekly" and current_day not in ["monday", "thursday"]:
-                continue
-            
             # Obter notícias para este usuário
-            logger.info(f"Buscando notícias para usuário {user_id}")
             news_count = user_data.get("news_count", config.MAX_NEWS_PER_DAY)
-            user_news = news_fetcher.get_news_for_user(user_id, count=news_count)
+            signature = news_fetcher.preference_signature(user_id, news_count)
+            
+            if signature not in digests:
+                logger.info(f"Buscando notícias para usuário {user_id}")
+                with profiling.span("digest", user_id, categories=",".join(signature[0])):
+                    user_news = news_fetcher.get_news_for_user(user_id, count=news_count, article_pool=article_pool)
+                    
+                    # Formatar mensagem para WhatsApp
+                    message = news_fetcher.format_news_for_whatsapp(user_news) if user_news else None
+                digests[signature] = (user_news, message)
+            
+            user_news, message = digests[signature]
             
             if not user_news:
                 logger.warning(f"Nenhuma notícia encontrada para o usuário {user_id}")
                 continue
             
-            # Formatar mensagem para WhatsApp
-            message = news_fetcher.format_news_for_whatsapp(user_news)
-            
-            # Enviar mensagem
-            logger.info(f"Enviando {len(user_news)} notícias para {user_phone}")
-            success = whatsapp_sender.send_message(user_phone, message)
-            
-            if success:
-                # Atualizar estatísticas do usuário
-                if "stats" not in user_data:
-                    user_data["stats"] = {}
-                
-                if "messages_sent" not in user_data["stats"]:
-                    user_data["stats"]["messages_sent"] = 0
-                    
-                if "news_sent" not in user_data["stats"]:
-                    user_data["stats"]["news_sent"] = 0
-                
-                user_data["stats"]["messages_sent"] += 1
-                user_data["stats"]["news_sent"] += len(user_news)
-                user_data["stats"]["last_sent"] = datetime.now().isoformat()
-                
-                # Salvar usuários atualizados
-                save_users(users)
-                
-            else:
-                logger.error(f"Falha ao enviar notícias para o usuário {user_id}")
+            messages.append({
+                "dedupe_key": dedupe_key,
+                "user_id": user_id,
+                "phone": user_phone,
+                "message": message,
+                "data": {"news_count": len(user_news)}
+            })
         
         except Exception as e:
             logger.error(f"Erro ao processar usuário {user_id}: {e}")
     
-    logger.info("Envio de notícias diárias concluído")
+    logger.info(f"{len(messages)} mensagens montadas a partir de {len(digests)} combinações de preferências")
+    
+    # Gravar as mensagens na fila antes de enviar, para poder retomar se o processo parar
+    message_queue.enqueue(job_id, messages)
+    
+    # Enviar as mensagens em paralelo, respeitando o limite de envios por segundo
+    report = message_queue.drain(delivery_engine, on_result=_on_delivery_result)
+    
+    # Gravar as estatísticas que ainda não foram salvas
+    user_store.flush()
+    
+    logger.info(f"Envio de notícias diárias concluído: {report.as_dict()}")
+    return report
+
+def run_job(name, func, *args):
+    """Executa uma rodada (envio ou pré-carregamento); com --profile, registra o trace da execução"""
+    if profile_runs:
+        return profiling.profiled(name, func, *args, trace_memory=profile_memory)
+    return func(*args)
+
+def _active_categories(selected_users):
+    """Categorias preferidas dos usuários ativos, na ordem de config.NEWS_SOURCES"""
+    categories = set()
+    for user_id, user_data in selected_users.items():
+        if user_data.get("active", True):
+            user_prefs = news_fetcher.user_preferences.get(str(user_id), {})
+            categories.update(user_prefs.get("categories", ["geral"]))
+    
+    return [category for category in config.NEWS_SOURCES if category in categories]
+
+def prefetch_news():
+    """Busca, extrai e verifica as notícias antes do horário de envio e grava o resultado"""
+    logger.info("Pré-carregando notícias para o próximo envio...")
+    
+    # Cada categoria é buscada uma única vez e reaproveitada para todos os usuários
+    article_pool = news_fetcher.build_article_pool(_active_categories(users))
+    news_fetcher.save_article_pool(article_pool)
+    return article_pool
+
+def get_article_pool(selected_users):
+    """Conjunto de notícias para o envio: o pré-carregado, completado com as categorias que faltarem"""
+    categories = _active_categories(selected_users)
+    article_pool = news_fetcher.load_article_pool(config.ARTICLE_POOL_MAX_AGE_MINUTES) or {}
+    
+    missing = [category for category in categories if category not in article_pool]
+    if missing:
+        logger.info(f"Buscando categorias que não foram pré-carregadas: {', '.join(missing)}")
+        missing_pool = news_fetcher.build_article_pool(missing)
+        article_pool.update(missing_pool)
+        
+        # Gravar só as categorias novas; as já gravadas mantêm a data em que foram montadas
+        news_fetcher.save_article_pool(missing_pool)
+    
+    return article_pool
+
+def _on_delivery_result(job, success):
+    """Registra o resultado de uma mensagem enviada a partir da fila"""
+    if not success:
+        logger.error(f"Falha ao enviar mensagem para o usuário {job.data['user_id']} ({job.data['job_id']})")
+    elif "news_count" in job.data:
+        # Atualizar estatísticas do usuário (gravadas em lotes)
+        user_store.record_delivery(job.data["user_id"], job.data["news_count"])
+
+def drain_outbox():
+    """Envia as mensagens pendentes da fila (novas tentativas e rodadas interrompidas)"""
+    report = message_queue.drain(delivery_engine, on_result=_on_delivery_result)
+    if report.sent or report.failed:
+        user_store.flush()
+        logger.info(f"Fila de mensagens processada: {report.as_dict()}")
+    return report
 
 def send_news_to_user(user_id, count=None):
     """Envia notícias para um usuário específico sob demanda"""
@@ -170,22 +269,8 @@ def send_news_to_user(user_id, count=None):
         success = whatsapp_sender.send_message(user_phone, message)
         
         if success:
-            # Atualizar estatísticas
-            if "stats" not in user_data:
-                user_data["stats"] = {}
-            
-            if "messages_sent" not in user_data["stats"]:
-                user_data["stats"]["messages_sent"] = 0
-                
-            if "news_sent" not in user_data["stats"]:
-                user_data["stats"]["news_sent"] = 0
-            
-            user_data["stats"]["messages_sent"] += 1
-            user_data["stats"]["news_sent"] += len(user_news)
-            user_data["stats"]["last_sent"] = datetime.now().isoformat()
-            
-            # Salvar usuários atualizados
-            save_users(users)
+            # Atualizar estatísticas (gravadas em lotes)
+            user_store.record_delivery(user_id, len(user_news))
             
             return True
         else:
@@ -195,7 +280,8 @@ def send_news_to_user(user_id, count=None):
         logger.error(f"Erro ao enviar notícias para o usuário {user_id}: {e}")
         return False
 
-def add_user(name, phone, categories=None, excluded_topics=None, frequency="daily", news_count=5):
+def add_user(name, phone, categories=None, excluded_topics=None, frequency="daily", news_count=5,
+             send_time=None, timezone=None):
     """Adiciona um novo usuário ao sistema"""
     # Gerar ID único para o usuário
     user_id = str(int(time.time()))
@@ -216,6 +302,17 @@ def add_user(name, phone, categories=None, excluded_topics=None, frequency="dail
         
         categories = valid_categories
     
+    # Verificar horário e fuso de envio
+    if send_time is None or parse_send_time(send_time) is None:
+        if send_time is not None:
+            logger.warning(f"Horário de envio inválido ignorado: {send_time}")
+        send_time = config.DEFAULT_SEND_TIME
+    
+    if timezone is None or get_timezone(timezone) is None:
+        if timezone is not None:
+            logger.warning(f"Fuso horário inválido ignorado: {timezone}")
+        timezone = config.DEFAULT_TIMEZONE
+    
     # Criar dados do usuário
     user_data = {
         "id": user_id,
@@ -225,6 +322,8 @@ def add_user(name, phone, categories=None, excluded_topics=None, frequency="dail
         "created_at": datetime.now().isoformat(),
         "frequency": frequency,
         "news_count": news_count,
+        "send_time": send_time,
+        "timezone": timezone,
         "stats": {
             "messages_sent": 0,
             "news_sent": 0
@@ -233,7 +332,8 @@ def add_user(name, phone, categories=None, excluded_topics=None, frequency="dail
     
     # Adicionar usuário à lista
     users[user_id] = user_data
-    save_users(users)
+    user_store.save()
+    delivery_scheduler.reschedule(user_id)
     
     # Configurar preferências
     preferences = {
@@ -250,7 +350,7 @@ def add_user(name, phone, categories=None, excluded_topics=None, frequency="dail
 
 Olá, {name}! Você foi cadastrado(a) com sucesso em nosso serviço de envio de notícias.
 
-Você receberá {news_count} notícias {frequency}, sobre os seguintes temas:
+Você receberá {news_count} notícias {frequency}, às {send_time}, sobre os seguintes temas:
 {', '.join(categories)}
 
 Para alterar suas preferências ou caso precise de ajuda, entre em contato com nosso administrador.
@@ -287,8 +387,10 @@ def create_user():
     excluded_topics = data.get('excluded_topics')
     frequency = data.get('frequency', 'daily')
     news_count = data.get('news_count', 5)
+    send_time = data.get('send_time')
+    timezone = data.get('timezone')
     
-    user_id = add_user(name, phone, categories, excluded_topics, frequency, news_count)
+    user_id = add_user(name, phone, categories, excluded_topics, frequency, news_count, send_time, timezone)
     
     return jsonify({'message': 'Usuário criado com sucesso', 'user_id': user_id}), 201
 
@@ -304,8 +406,14 @@ def update_user(user_id):
     
     user_data = users[user_id]
     
+    if 'send_time' in data and parse_send_time(data['send_time']) is None:
+        return jsonify({'error': 'Horário de envio inválido (use HH:MM)'}), 400
+    
+    if 'timezone' in data and get_timezone(data['timezone']) is None:
+        return jsonify({'error': 'Fuso horário inválido'}), 400
+    
     # Atualizar campos básicos
-    for field in ['name', 'phone', 'active', 'frequency', 'news_count']:
+    for field in ['name', 'phone', 'active', 'frequency', 'news_count', 'send_time', 'timezone']:
         if field in data:
             user_data[field] = data[field]
     
@@ -329,7 +437,8 @@ def update_user(user_id):
         news_fetcher.update_user_preference(user_id, preferences)
     
     # Salvar alterações
-    save_users(users)
+    user_store.save()
+    delivery_scheduler.reschedule(user_id)
     
     return jsonify({'message': 'Usuário atualizado com sucesso'})
 
@@ -346,7 +455,8 @@ def delete_user(user_id):
     
     # Remover usuário
     del users[user_id]
-    save_users(users)
+    user_store.save()
+    delivery_scheduler.remove(user_id)
     
     # Enviar mensagem de despedida
     if phone:
@@ -379,15 +489,15 @@ def send_user_news(user_id):
 
 @app.route('/api/broadcast', methods=['POST'])
 def broadcast_message():
-    """Envia uma mensagem personalizada para todos os usuários ativos"""
+    """Enfileira uma mensagem personalizada para todos os usuários ativos e a envia em segundo plano"""
     data = request.json
     
     if not data or not 'message' in data:
         return jsonify({'error': 'Mensagem não fornecida'}), 400
     
     message = data['message']
-    success_count = 0
-    failure_count = 0
+    job_id = f"broadcast-{uuid.uuid4().hex[:12]}"
+    messages = []
     
     for user_id, user_data in users.items():
         if not user_data.get('active', True):
@@ -400,16 +510,78 @@ def broadcast_message():
         # Personalizar mensagem com nome do usuário
         personalized_message = message.replace("{nome}", user_data.get('name', ''))
         
-        # Enviar mensagem
-        success = whatsapp_sender.send_message(phone, personalized_message)
+        messages.append({
+            "dedupe_key": f"{job_id}:{user_id}",
+            "user_id": user_id,
+            "phone": phone,
+            "message": personalized_message
+        })
+    
+    if not messages:
+        return jsonify({
+            'message': 'Nenhum usuário ativo para receber o broadcast',
+            'total': 0
+        })
+    
+    # Enfileirar e enviar em segundo plano
+    message_queue.enqueue(job_id, messages)
+    threading.Thread(target=_run_broadcast, args=(job_id,), name=job_id, daemon=True).start()
+    
+    return jsonify({
+        'message': f'Broadcast para {len(messages)} usuários iniciado',
+        'job_id': job_id
+    }), 202
+
+def _run_broadcast(job_id):
+    """Envia as mensagens de um broadcast (executado em uma thread separada)
+    
+    Repete a drenagem até não sobrar nada pendente, dormindo até a próxima nova
+    tentativa agendada; mensagens ainda com o método alternativo são aguardadas.
+    """
+    try:
+        while True:
+            message_queue.drain(delivery_engine, on_result=_on_delivery_result, job_id=job_id)
+            
+            counts = message_queue.counts(job_id)
+            if not counts['pending'] + counts['sending']:
+                break
+            
+            # Dormir até a próxima nova tentativa agendada
+            next_at = message_queue.next_attempt_at(job_id)
+            if next_at is None:
+                wait = BROADCAST_POLL_SECONDS
+            else:
+                wait = max(1, next_at - time.time())
+            time.sleep(wait)
         
-        if success:
-            success_count += 1
-        else:
-            failure_count += 1
+        user_store.flush()
+        logger.info(f"Broadcast {job_id} concluído: {message_queue.counts(job_id)}")
+    except Exception as e:
+        logger.error(f"Erro ao enviar broadcast {job_id}: {e}")
+
+def resume_broadcasts():
+    """Retoma os broadcasts que ficaram com mensagens pendentes (ex.: o processo web foi reiniciado)"""
+    for job_id in message_queue.unfinished_jobs("broadcast-"):
+        logger.info(f"Retomando broadcast {job_id}")
+        threading.Thread(target=_run_broadcast, args=(job_id,), name=job_id, daemon=True).start()
+
+@app.route('/api/broadcast/<job_id>', methods=['GET'])
+def get_broadcast_status(job_id):
+    """Informa o andamento de um broadcast"""
+    counts = message_queue.counts(job_id)
+    total = sum(counts.values())
     
+    if not total:
+        return jsonify({'error': 'Broadcast não encontrado'}), 404
+    
+    pending = counts['pending'] + counts['sending']
     return jsonify({
-        'message': f'Broadcast enviado para {success_count} usuários com sucesso ({failure_count} falhas)'
+        'job_id': job_id,
+        'status': 'running' if pending else 'completed',
+        'total': total,
+        'sent': counts['sent'],
+        'failed': counts['dead'],
+        'pending': pending
     })
 
 @app.route('/api/stats', methods=['GET'])
@@ -446,25 +618,46 @@ def get_stats():
         'system_start': os.path.getmtime(os.path.abspath(__file__))
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Contadores e histogramas de latência de cada etapa, no formato de texto do Prometheus"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # ----- Configuração do Agendador -----
 
 def setup_scheduler():
     """Configura o agendador para executar tarefas periódicas"""
-    # Enviar notícias diárias às 8:00
-    schedule.every().day.at(config.DEFAULT_SEND_TIME).do(send_daily_news)
+    # Enviar notícias a cada usuário no seu horário e fuso
+    delivery_scheduler.schedule_all()
+    
+    # Pré-carregar as notícias antes do horário padrão de envio
+    hour, minute = parse_send_time(config.DEFAULT_SEND_TIME)
+    prefetch_at = datetime(2000, 1, 1, hour, minute) - timedelta(minutes=config.PREFETCH_LEAD_MINUTES)
+    delivery_scheduler.daily_at(prefetch_at.strftime("%H:%M"), lambda: run_job("prefetch_news", prefetch_news),
+                                name="prefetch_news")
     
     # Log diário às 00:01
-    schedule.every().day.at("00:01").do(lambda: logger.info("Relatório diário: Sistema funcionando normalmente"))
+    delivery_scheduler.daily_at("00:01", lambda: logger.info("Relatório diário: Sistema funcionando normalmente"),
+                                name="relatorio_diario")
+    
+    # Reenviar mensagens que falharam e aguardam nova tentativa
+    delivery_scheduler.every(config.QUEUE_RETRY_INTERVAL_MINUTES, drain_outbox)
     
-    logger.info(f"Agendador configurado. Próximo envio de notícias às {config.DEFAULT_SEND_TIME}")
+    logger.info(f"Agendador configurado. Próximo envio de notícias: {delivery_scheduler.next_delivery()}")
 
 def run_scheduler():
     """Executa o agendador em um loop infinito"""
     setup_scheduler()
     
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Verificar a cada minuto
+    # Retomar envios que ficaram pendentes na fila
+    drain_outbox()
+    
+    # Ler os feeds continuamente em segundo plano
+    if config.FEED_POLL_ENABLED:
+        threading.Thread(target=feed_poller.run, name="feed-poller", daemon=True).start()
+    
+    # Dorme até o próximo envio ou tarefa agendada
+    delivery_scheduler.run()
 
 # ----- Inicialização do Aplicativo -----
 
@@ -478,8 +671,17 @@ if __name__ == "__main__":
     parser.add_argument('--port', type=int, default=5000, help='Porta para a interface web')
     parser.add_argument('--add-user', action='store_true', help='Adicionar novo usuário')
     parser.add_argument('--send-now', action='store_true', help='Enviar notícias agora para todos os usuários')
+    parser.add_argument('--prefetch', action='store_true', help='Pré-carregar as notícias do próximo envio')
+    parser.add_argument('--profile', action='store_true',
+                        help='Gravar um relatório de execução (tempos por etapa e pico de memória) a cada envio')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='Com --profile, medir também o pico de memória Python (tracemalloc; deixa a execução mais lenta)')
     
     args = parser.parse_args()
+    profile_runs = args.profile or args.profile_memory
+    profile_memory = args.profile_memory
+    
+    init_app()
     
     # Ação baseada nos argumentos
     if args.add_user:
@@ -497,7 +699,17 @@ if __name__ == "__main__":
     elif args.send_now:
         # Enviar notícias imediatamente para todos os usuários
         print("Enviando notícias para todos os usuários...")
-        send_daily_news()
+        run_job("send_daily_news", send_daily_news)
+        
+        # Aguardar as mensagens que foram para o método alternativo antes de sair
+        delivery_engine.wait_fallback()
+        user_store.flush()
+        print("Concluído!")
+    
+    elif args.prefetch:
+        # Buscar e verificar as notícias sem enviar
+        print("Pré-carregando notícias...")
+        run_job("prefetch_news", prefetch_news)
         print("Concluído!")
     
     elif args.scheduler:
@@ -508,16 +720,16 @@ if __name__ == "__main__":
     elif args.web:
         # Iniciar apenas a interface web
         print(f"Iniciando interface web na porta {args.port}...")
+        resume_broadcasts()
         app.run(host='0.0.0.0', port=args.port, debug=config.DEBUG_MODE)
     
     else:
         # Comportamento padrão: iniciar web e agendador em threads separados
-        import threading
-        
         # Thread para o agendador
         scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         scheduler_thread.start()
         
         # Iniciar a interface web
         print(f"Iniciando sistema completo (web + agendador) na porta {args.port}...")
+        resume_broadcasts()
         app.run(host='0.0.0.0', port=args.port, debug=config.DEBUG_MODE) 
\ No newline at end of file
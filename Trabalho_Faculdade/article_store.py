@@ -0,0 +1,134 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("article_store")
+
+# Colunas de texto guardadas como estão no dicionário do artigo
+TEXT_FIELDS = ["title", "content", "summary", "image_url", "published_date", "source"]
+
+
+class ArticleStore:
+    """Armazena em SQLite os artigos já extraídos e verificados, indexados pela URL"""
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(config.CACHE_DIR, "articles.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Cria a tabela de artigos, se ainda não existir"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    url TEXT PRIMARY KEY,
+                    title TEXT,
+                    content TEXT,
+                    summary TEXT,
+                    image_url TEXT,
+                    published_date TEXT,
+                    source TEXT,
+                    sentiment REAL,
+                    categories TEXT,
+                    reliable INTEGER NOT NULL DEFAULT 0,
+                    processed_at TEXT NOT NULL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_articles_processed_at ON articles (processed_at)"
+            )
+    
+    def _row_to_article(self, row):
+        """Converte uma linha do banco no dicionário de artigo usado pelo sistema"""
+        article = {field: row[field] or "" for field in TEXT_FIELDS}
+        article["url"] = row["url"]
+        article["sentiment"] = row["sentiment"] or 0
+        article["categories"] = json.loads(row["categories"]) if row["categories"] else []
+        article["reliable"] = bool(row["reliable"])
+        article["processed_at"] = row["processed_at"]
+        return article
+    
+    def contains(self, url):
+        """Verifica se o artigo da URL já está armazenado"""
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM articles WHERE url = ?", (url,)).fetchone()
+        return row is not None
+    
+    def get(self, url):
+        """Retorna o artigo armazenado para a URL, ou None"""
+        return self.get_many([url]).get(url)
+    
+    def get_many(self, urls):
+        """Retorna um dicionário {url: artigo} com os artigos armazenados"""
+        urls = list(urls)
+        articles = {}
+        
+        with self._lock:
+            # Consultar em lotes para respeitar o limite de parâmetros do SQLite
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT * FROM articles WHERE url IN ({placeholders})", chunk
+                ).fetchall()
+                for row in rows:
+                    articles[row["url"]] = self._row_to_article(row)
+        
+        return articles
+    
+    def save_many(self, articles):
+        """Grava vários artigos em uma única transação"""
+        now = datetime.now().isoformat()
+        rows = []
+        for article in articles:
+            rows.append((
+                article["url"],
+                *[article.get(field, "") for field in TEXT_FIELDS],
+                article.get("sentiment", 0),
+                json.dumps(article.get("categories", []), ensure_ascii=False),
+                1 if article.get("reliable") else 0,
+                article.get("processed_at", now)
+            ))
+        
+        if not rows:
+            return
+        
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany("""
+                    INSERT OR REPLACE INTO articles
+                        (url, title, content, summary, image_url, published_date, source,
+                         sentiment, categories, reliable, processed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao salvar artigos: {e}")
+    
+    def save(self, article):
+        """Grava um único artigo"""
+        self.save_many([article])
+    
+    def prune(self, older_than):
+        """Remove artigos processados antes da data informada (datetime)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM articles WHERE processed_at < ?", (older_than.isoformat(),)
+            )
+        return cursor.rowcount
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
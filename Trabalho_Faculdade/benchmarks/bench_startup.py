@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Mede o tempo de inicialização (a frio) de cada ponto de entrada do InfoIdosos.
+
+Cada medição roda em um processo Python novo, com um DATA_DIR temporário e o
+transporte simulado, então nada é enviado e os dados reais não são tocados.
+Com --importtime, mostra também os módulos que mais pesam na importação do app.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --importtime
+    python benchmarks/bench_startup.py --compare benchmarks/results/<anterior>.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Ponto de entrada -> comando executado (a partir da pasta do projeto)
+ENTRY_POINTS = {
+    "start.py --check": ["start.py", "--check"],
+    "app.py --help": ["app.py", "--help"],
+    "--add-user (import app)": ["-c", "import app; app.init_app()"],
+    "--web (primeira requisição)": ["-c", "import app; app.init_app(); app.app.test_client().get('/api/stats')"],
+    "--scheduler (agendador configurado)": ["-c", "import app; app.init_app(); app.setup_scheduler()"],
+}
+
+
+def probe_env(data_dir):
+    """Ambiente isolado para as medições"""
+    env = dict(os.environ)
+    env.update({
+        "DATA_DIR": data_dir,
+        "WHATSAPP_TRANSPORT": "mock",
+        "WHATSAPP_FALLBACK_TRANSPORT": "",
+        "FEED_POLL_ENABLED": "false",
+        "LOG_LEVEL": "ERROR",
+    })
+    return env
+
+
+def run_probe(args, env):
+    """Executa o comando em um processo novo e retorna o tempo total em segundos"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable] + args, cwd=PROJECT_DIR, env=env,
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                           f"código de saída {completed.returncode}")
+    return elapsed
+
+
+def import_profile(env, top):
+    """Módulos mais lentos (tempo acumulado) ao importar o app, segundo `python -X importtime`"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=PROJECT_DIR,
+                               env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE, text=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        # Formato: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative), name.strip()))
+    modules.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in modules[:top]]
+
+
+def compare(current, previous_path):
+    """Mostra a variação da mediana de cada ponto de entrada em relação a um resultado anterior"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    
+    print(f"\nComparação com {previous_path} ({previous.get('timestamp', '?')}):")
+    for name, entry in current["entry_points"].items():
+        old = previous.get("entry_points", {}).get(name)
+        if not old or "median_ms" not in old or "median_ms" not in entry:
+            print(f"  {name}: sem resultado para comparar")
+            continue
+        change = ((entry["median_ms"] - old["median_ms"]) / old["median_ms"] * 100) if old["median_ms"] else 0.0
+        print(f"  {name}: {old['median_ms']:.0f} ms -> {entry['median_ms']:.0f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização dos pontos de entrada do InfoIdosos")
+    parser.add_argument('--repeat', type=int, default=5, help='Execuções de cada ponto de entrada')
+    parser.add_argument('--importtime', action='store_true', help='Mostrar os módulos mais lentos ao importar o app')
+    parser.add_argument('--top', type=int, default=15, help='Quantidade de módulos mostrados com --importtime')
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: benchmarks/results/startup-<data>.json)')
+    parser.add_argument('--compare', help='Resultado anterior (JSON) para comparação')
+    args = parser.parse_args()
+    
+    env = probe_env(tempfile.mkdtemp(prefix="infoidosos-startup-"))
+    
+    # Uma execução de aquecimento cria os bancos e os .pyc, para medir apenas a inicialização
+    try:
+        run_probe(ENTRY_POINTS["--add-user (import app)"], env)
+    except RuntimeError as e:
+        print(f"Aviso: o app não pôde ser importado ({e})")
+    
+    entry_points = {}
+    print(f"{'Ponto de entrada':<40} {'mín ms':>10} {'mediana ms':>12} {'máx ms':>10}")
+    for name, probe_args in ENTRY_POINTS.items():
+        try:
+            timings = sorted(run_probe(probe_args, env) for _ in range(args.repeat))
+        except RuntimeError as e:
+            entry_points[name] = {"error": str(e)}
+            print(f"{name:<40} erro: {e}")
+            continue
+        
+        entry_points[name] = {
+            "runs": len(timings),
+            "min_ms": round(timings[0] * 1000, 1),
+            "median_ms": round(timings[len(timings) // 2] * 1000, 1),
+            "max_ms": round(timings[-1] * 1000, 1),
+        }
+        entry = entry_points[name]
+        print(f"{name:<40} {entry['min_ms']:>10.0f} {entry['median_ms']:>12.0f} {entry['max_ms']:>10.0f}")
+    
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "entry_points": entry_points,
+    }
+    
+    if args.importtime:
+        result["slowest_imports"] = import_profile(env, args.top)
+        print("\nMódulos mais lentos ao importar o app (tempo acumulado):")
+        for module in result["slowest_imports"]:
+            print(f"  {module['cumulative_ms']:>8.1f} ms  {module['module']}")
+    
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"startup-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {output}")
+    
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Servidor HTTP local que simula os sites de notícias para os benchmarks offline.
+
+Serve os feeds e as páginas de artigos gravados em `benchmarks/fixtures`:
+
+- /feeds/<nome>.xml: o feed gravado, com links para artigos exclusivos desse feed
+- /artigos/<nome>-<n>.html: a página de artigo correspondente à n-ésima entrada do feed
+"""
+
+import os
+import re
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Entrada do feed que aponta para o artigo com características de fake news
+FAKE_ARTICLE_INDEX = 2
+
+
+def _read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class FixtureServer:
+    """Servidor de fixtures em uma thread de fundo, com latência simulada opcional"""
+    
+    def __init__(self, latency_ms=0, host="127.0.0.1", port=0):
+        self.latency = latency_ms / 1000.0
+        self.feed_template = _read_fixture("feed.xml")
+        self.article_templates = [_read_fixture(f"article_{i}.html") for i in range(3)]
+        self.titles = re.findall(r"<item>\s*<title>(.*?)</title>", self.feed_template)
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def feed_url(self, name):
+        return f"{self.base_url}/feeds/{name}.xml"
+    
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def render(self, path):
+        """Retorna (tipo de conteúdo, corpo) para o caminho pedido, ou None"""
+        match = re.fullmatch(r"/feeds/([\w-]+)\.xml", path)
+        if match:
+            body = self.feed_template.replace("{base_url}", self.base_url).replace("{feed}", match.group(1))
+            return "application/rss+xml; charset=utf-8", body
+        
+        match = re.fullmatch(r"/artigos/([\w-]+)-(\d+)\.html", path)
+        if match:
+            index = int(match.group(2)) % len(self.titles)
+            template = self.article_templates[2 if index == FAKE_ARTICLE_INDEX else index % 2]
+            body = template.replace("{base_url}", self.base_url).replace("{title}", self.titles[index])
+            return "text/html; charset=utf-8", body
+        
+        return None
+    
+    def _make_handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                
+                with server._lock:
+                    server.requests_served += 1
+                
+                rendered = server.render(self.path.split("?")[0])
+                if rendered is None:
+                    self.send_error(404)
+                    return
+                
+                content_type, body = rendered
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
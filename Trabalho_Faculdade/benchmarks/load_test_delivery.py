@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Teste de carga offline do envio de mensagens.
+
+Usa o transporte simulado (MockTransport) no lugar do Twilio, com latência e
+taxa de erros configuráveis, e cadastra usuários fictícios em um diretório de
+dados temporário. Pode exercitar:
+
+- broadcast: a rota POST /api/broadcast, pelo cliente de testes do Flask
+- daily: send_daily_news, com as notícias vindas do servidor local de fixtures
+
+Uso:
+    python benchmarks/load_test_delivery.py --recipients 100000 --mode broadcast
+    python benchmarks/load_test_delivery.py --recipients 5000 --mode daily --latency-ms 150
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga offline do envio de mensagens")
+    parser.add_argument('--recipients', type=int, default=10000, help='Quantidade de usuários fictícios')
+    parser.add_argument('--mode', choices=['broadcast', 'daily'], default='broadcast')
+    parser.add_argument('--latency-ms', type=float, default=200, help='Latência simulada de cada envio')
+    parser.add_argument('--error-rate', type=float, default=0.01, help='Fração de envios que falham')
+    parser.add_argument('--workers', type=int, default=64, help='Envios simultâneos')
+    parser.add_argument('--rate', type=float, default=0, help='Limite de mensagens por segundo (0 = sem limite)')
+    parser.add_argument('--output', help='Arquivo JSON de saída')
+    args = parser.parse_args()
+    
+    # Configurar o ambiente antes de importar o aplicativo
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="infoidosos-load-")
+    os.environ["WHATSAPP_TRANSPORT"] = "mock"
+    os.environ["WHATSAPP_FALLBACK_TRANSPORT"] = ""
+    os.environ["MOCK_TRANSPORT_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["MOCK_TRANSPORT_ERROR_RATE"] = str(args.error_rate)
+    os.environ["DELIVERY_WORKERS"] = str(args.workers)
+    os.environ["DELIVERY_RATE_PER_SECOND"] = str(args.rate)
+    os.environ["QUEUE_MAX_ATTEMPTS"] = "1"
+    # Todos os "sites" são o mesmo servidor local: liberar o limite por site
+    os.environ["FETCH_HOST_DELAY"] = "0"
+    os.environ["FETCH_MAX_PER_HOST"] = os.environ.get("FETCH_WORKERS", "8")
+    
+    import config
+    import app
+    from fixture_server import FixtureServer
+    
+    app.init_app()
+    logging.getLogger().setLevel(logging.ERROR)
+    
+    # Cadastrar os usuários fictícios direto na memória (sem mensagem de boas-vindas)
+    categories = list(config.NEWS_SOURCES.keys())
+    for i in range(args.recipients):
+        user_id = f"carga-{i}"
+        app.users[user_id] = {
+            "id": user_id,
+            "name": f"Usuário {i}",
+            "phone": f"519{i:08d}",
+            "active": True,
+            "frequency": "daily",
+            "news_count": 5,
+            "stats": {"messages_sent": 0, "news_sent": 0}
+        }
+        app.news_fetcher.user_preferences[user_id] = {"categories": [categories[i % len(categories)]]}
+    app.user_store.save()
+    
+    start = time.perf_counter()
+    if args.mode == "broadcast":
+        client = app.app.test_client()
+        response = client.post('/api/broadcast', json={"message": "Olá, {nome}! Mensagem de teste de carga."})
+        job_id = response.get_json()["job_id"]
+        print(f"POST /api/broadcast respondeu em {time.perf_counter() - start:.3f}s (job {job_id})")
+        
+        # Acompanhar o andamento até o fim
+        while True:
+            status = client.get(f'/api/broadcast/{job_id}').get_json()
+            if status["status"] == "completed":
+                break
+            time.sleep(0.5)
+        print(status)
+    else:
+        with FixtureServer() as server:
+            config.NEWS_SOURCES = {
+                category: [server.feed_url(f"{category}-{i}") for i in range(len(feeds))]
+                for category, feeds in config.NEWS_SOURCES.items()
+            }
+            app.send_daily_news()
+    elapsed = time.perf_counter() - start
+    
+    transport = app.whatsapp_sender.transport
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "mode": args.mode,
+        "recipients": args.recipients,
+        "settings": {
+            "latency_ms": args.latency_ms,
+            "error_rate": args.error_rate,
+            "workers": args.workers,
+            "rate_per_second": args.rate,
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "messages_per_second": round((transport.sent + transport.failed) / elapsed, 2) if elapsed else None,
+        "sent": transport.sent,
+        "failed": transport.failed,
+        "queue": app.message_queue.counts(),
+    }
+    
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"load-{args.mode}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
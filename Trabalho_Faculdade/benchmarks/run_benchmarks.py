@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmarks offline dos trechos mais custosos do InfoIdosos.
+
+Os feeds e artigos são servidos por um servidor HTTP local (fixture_server.py)
+a partir das fixtures gravadas, então nenhuma requisição sai da máquina.
+Os resultados (vazão e percentis de latência por etapa) são salvos em JSON
+para que execuções diferentes possam ser comparadas.
+
+Uso:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --iterations 10 --latency-ms 30
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<anterior>.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import config
+import text_analysis
+from fake_news_detector import FakeNewsDetector, verify_news, verify_news_batch
+from news_fetcher import NewsFetcher, extract_article
+from fixture_server import FixtureServer
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def percentile(values, pct):
+    """Percentil por interpolação linear (valores em qualquer ordem)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies, items_per_call):
+    """Resume as latências (em segundos) de uma etapa"""
+    total = sum(latencies)
+    items = items_per_call * len(latencies)
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "total_s": round(total, 6),
+        "throughput_per_s": round(items / total, 2) if total else None,
+        "latency_ms": {
+            "mean": round(total / len(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(max(latencies) * 1000, 3) if latencies else 0.0,
+        }
+    }
+
+
+def measure(func, repeat, setup=None):
+    """Executa `func` `repeat` vezes e retorna as latências de cada chamada"""
+    latencies = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def use_fresh_cache_dir():
+    """Aponta o cache para um diretório vazio, para que nada seja reaproveitado entre medições"""
+    config.CACHE_DIR = tempfile.mkdtemp(prefix="infoidosos-bench-")
+
+
+def bench_fetch(args):
+    """Etapas de busca: feed + download + extração + verificação"""
+    results = {}
+    limit = 10
+    
+    # fetch_news_by_category com dados novos a cada chamada
+    fetcher_holder = {}
+    
+    def new_fetcher():
+        use_fresh_cache_dir()
+        fetcher_holder["fetcher"] = NewsFetcher()
+    
+    latencies = measure(
+        lambda: fetcher_holder["fetcher"].fetch_news_by_category("geral", limit=limit),
+        args.iterations, setup=new_fetcher
+    )
+    results["fetch_news_by_category"] = summarize(latencies, len(config.NEWS_SOURCES["geral"]) * limit)
+    
+    # Montagem do conjunto de notícias de todas as categorias
+    latencies = measure(
+        lambda: fetcher_holder["fetcher"].build_article_pool(limit=limit),
+        args.iterations, setup=new_fetcher
+    )
+    total_feeds = sum(len(feeds) for feeds in config.NEWS_SOURCES.values())
+    results["build_article_pool"] = summarize(latencies, total_feeds * limit)
+    
+    return results
+
+
+def bench_detector(server, args):
+    """Etapas de extração, detecção de fake news e formatação"""
+    results = {}
+    sample_pages = []
+    for index in range(len(server.titles)):
+        path = f"/artigos/amostra-{index}.html"
+        sample_pages.append((server.base_url + path, server.render(path)[1]))
+    
+    # Sem artigos extraídos, as etapas seguintes mediriam listas vazias (0 itens, 0 ms)
+    articles = [article for article, _ in (extract_article(url, html) for url, html in sample_pages) if article]
+    if len(articles) < len(sample_pages):
+        raise RuntimeError(
+            f"apenas {len(articles)} de {len(sample_pages)} páginas de amostra foram extraídas "
+            f"(verifique o newspaper3k e o recurso 'punkt' do NLTK)"
+        )
+    
+    # Extração (parse + nlp + análise de texto) de cada página
+    latencies = []
+    for _ in range(args.iterations):
+        for url, html in sample_pages:
+            text_analysis.clear_cache()
+            start = time.perf_counter()
+            extract_article(url, html)
+            latencies.append(time.perf_counter() - start)
+    results["extract_article"] = summarize(latencies, 1)
+    
+    detector = FakeNewsDetector()
+    repeat = args.iterations * 10
+    
+    # Avaliação individual, sem análise de texto em cache
+    for name, func in [
+        ("FakeNewsDetector.evaluate_text", detector.evaluate_text),
+        ("verify_news", verify_news),
+    ]:
+        latencies = []
+        for _ in range(repeat):
+            for article in articles:
+                text_analysis.clear_cache()
+                start = time.perf_counter()
+                func(article["title"], article["content"])
+                latencies.append(time.perf_counter() - start)
+        results[name] = summarize(latencies, 1)
+    
+    # Avaliação em lote
+    titles = [article["title"] for article in articles]
+    contents = [article["content"] for article in articles]
+    latencies = measure(lambda: verify_news_batch(titles, contents), repeat, setup=text_analysis.clear_cache)
+    results["verify_news_batch"] = summarize(latencies, len(articles))
+    
+    # Formatação da mensagem do WhatsApp com 5 notícias
+    fetcher = NewsFetcher()
+    digest = (articles * 5)[:5]
+    latencies = measure(lambda: fetcher.format_news_for_whatsapp(digest), repeat * 10)
+    results["format_news_for_whatsapp"] = summarize(latencies, len(digest))
+    
+    return results
+
+
+def compare(current, previous_path):
+    """Mostra a variação da mediana de cada etapa em relação a um resultado anterior"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    
+    print(f"\nComparação com {previous_path} ({previous.get('timestamp', '?')}):")
+    for name, stage in current["stages"].items():
+        old = previous.get("stages", {}).get(name)
+        if not old:
+            print(f"  {name}: sem resultado anterior")
+            continue
+        old_p50 = old["latency_ms"]["p50"]
+        new_p50 = stage["latency_ms"]["p50"]
+        change = ((new_p50 - old_p50) / old_p50 * 100) if old_p50 else 0.0
+        print(f"  {name}: p50 {old_p50:.3f} ms -> {new_p50:.3f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks offline do InfoIdosos")
+    parser.add_argument('--iterations', type=int, default=5, help='Repetições de cada etapa de busca')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Latência simulada por requisição HTTP')
+    parser.add_argument('--output', help='Arquivo JSON de saída (padrão: benchmarks/results/bench-<data>.json)')
+    parser.add_argument('--compare', help='Resultado anterior (JSON) para comparação')
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.ERROR)
+    
+    with FixtureServer(latency_ms=args.latency_ms) as server:
+        # Apontar as categorias para os feeds locais e liberar o limite por site,
+        # já que todos os "sites" são o mesmo servidor local
+        config.NEWS_SOURCES = {
+            category: [server.feed_url(f"{category}-{i}") for i in range(len(feeds))]
+            for category, feeds in config.NEWS_SOURCES.items()
+        }
+        config.FETCH_HOST_DELAY = 0
+        config.FETCH_MAX_PER_HOST = config.FETCH_WORKERS
+        config.DATA_DIR = tempfile.mkdtemp(prefix="infoidosos-bench-")
+        
+        stages = {}
+        try:
+            stages.update(bench_fetch(args))
+            stages.update(bench_detector(server, args))
+        except RuntimeError as e:
+            sys.exit(f"Erro no benchmark: {e}")
+    
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "iterations": args.iterations,
+            "latency_ms": args.latency_ms,
+            "fetch_workers": config.FETCH_WORKERS,
+            "extraction_mode": config.EXTRACTION_MODE,
+            "extraction_workers": config.EXTRACTION_WORKERS,
+        },
+        "stages": stages,
+    }
+    
+    print(f"{'Etapa':<32} {'itens/s':>10} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10}")
+    for name, stage in stages.items():
+        latency = stage["latency_ms"]
+        print(f"{name:<32} {stage['throughput_per_s'] or 0:>10.1f} "
+              f"{latency['p50']:>10.3f} {latency['p90']:>10.3f} {latency['p99']:>10.3f}")
+    
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados salvos em {output}")
+    
+    if args.compare:
+        compare(result, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,13 @@ TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.getenv("TWILIO_PHONE_NUMBER")
 
+# Transportes de envio: "twilio", "pywhatkit" ou "mock" (simulado, para testes de carga)
+WHATSAPP_TRANSPORT = os.getenv("WHATSAPP_TRANSPORT", "twilio")
+WHATSAPP_FALLBACK_TRANSPORT = os.getenv("WHATSAPP_FALLBACK_TRANSPORT", "pywhatkit")  # Vazio para desativar
+MOCK_TRANSPORT_LATENCY_MS = float(os.getenv("MOCK_TRANSPORT_LATENCY_MS", "200"))
+MOCK_TRANSPORT_JITTER_MS = float(os.getenv("MOCK_TRANSPORT_JITTER_MS", "50"))
+MOCK_TRANSPORT_ERROR_RATE = float(os.getenv("MOCK_TRANSPORT_ERROR_RATE", "0.01"))
+
 # Fontes de notícias confiáveis (URLs de RSS feeds)
 NEWS_SOURCES = {
     "geral": [
@@ -56,14 +63,44 @@ INTRO_MESSAGES = [
 
 # Configurações de envio
 DEFAULT_SEND_TIME = "08:00"  # Horário padrão para envio de notícias
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE", "America/Sao_Paulo")  # Fuso horário padrão dos usuários
+DELIVERY_SPREAD_MINUTES = int(os.getenv("DELIVERY_SPREAD_MINUTES", "30"))  # Janela (min) após o horário para distribuir os envios
+PREFETCH_LEAD_MINUTES = int(os.getenv("PREFETCH_LEAD_MINUTES", "30"))  # Antecedência (min) da busca de notícias em relação a DEFAULT_SEND_TIME
+ARTICLE_POOL_MAX_AGE_MINUTES = int(os.getenv("ARTICLE_POOL_MAX_AGE_MINUTES", "180"))  # Idade máxima do conjunto de notícias pré-carregado
 MAX_NEWS_PER_DAY = 10  # Número máximo de notícias por dia
 MIN_CONFIDENCE_SCORE = 0.7  # Pontuação mínima de confiança para enviar uma notícia
+USERS_FLUSH_INTERVAL_SECONDS = int(os.getenv("USERS_FLUSH_INTERVAL_SECONDS", "60"))  # Intervalo mínimo (s) entre gravações de users.json durante um envio
+DELIVERY_WORKERS = int(os.getenv("DELIVERY_WORKERS", "8"))  # Envios simultâneos
+DELIVERY_RATE_PER_SECOND = float(os.getenv("DELIVERY_RATE_PER_SECOND", "10"))  # Limite de mensagens por segundo do número Twilio
+DELIVERY_BURST = int(os.getenv("DELIVERY_BURST", "10"))  # Mensagens que podem sair de uma vez antes do limite valer
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "5"))  # Tentativas antes de mover a mensagem para dead_letters
+QUEUE_BACKOFF_SECONDS = float(os.getenv("QUEUE_BACKOFF_SECONDS", "60"))  # Espera antes da 2ª tentativa (dobra a cada falha)
+QUEUE_BACKOFF_MAX_SECONDS = float(os.getenv("QUEUE_BACKOFF_MAX_SECONDS", "3600"))  # Espera máxima entre tentativas
+QUEUE_RETRY_INTERVAL_MINUTES = int(os.getenv("QUEUE_RETRY_INTERVAL_MINUTES", "1"))  # Frequência com que a fila é verificada
+QUEUE_CLAIM_LEASE_SECONDS = float(os.getenv("QUEUE_CLAIM_LEASE_SECONDS", "3600"))  # Tempo de reserva de uma mensagem em envio antes de voltar para a fila
+
+# Configurações de busca de notícias
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", "8"))  # Downloads simultâneos de feeds e artigos
+FETCH_MAX_PER_HOST = int(os.getenv("FETCH_MAX_PER_HOST", "2"))  # Conexões simultâneas por site
+FETCH_HOST_DELAY = float(os.getenv("FETCH_HOST_DELAY", "1.0"))  # Intervalo mínimo (s) entre requisições ao mesmo site
+URL_DEDUPE_WINDOW_HOURS = int(os.getenv("URL_DEDUPE_WINDOW_HOURS", "72"))  # Por quanto tempo uma URL processada é lembrada
+ARTICLE_RETENTION_HOURS = int(os.getenv("ARTICLE_RETENTION_HOURS", "72"))  # Por quanto tempo os artigos ficam em articles.db (no mínimo URL_DEDUPE_WINDOW_HOURS)
+ARTICLE_PRUNE_INTERVAL_MINUTES = int(os.getenv("ARTICLE_PRUNE_INTERVAL_MINUTES", "60"))  # Frequência da limpeza de artigos antigos
+TEXT_ANALYSIS_CACHE_SIZE = int(os.getenv("TEXT_ANALYSIS_CACHE_SIZE", "4096"))  # Artigos com análise de texto em memória
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "thread")  # "thread" ou "process" (extração em vários núcleos)
+FEED_POLL_ENABLED = os.getenv("FEED_POLL_ENABLED", "True").lower() == "true"  # Ler os feeds continuamente junto com o agendador
+FEED_POLL_MIN_MINUTES = float(os.getenv("FEED_POLL_MIN_MINUTES", "5"))  # Intervalo mínimo entre leituras do mesmo feed
+FEED_POLL_MAX_MINUTES = float(os.getenv("FEED_POLL_MAX_MINUTES", "240"))  # Intervalo máximo entre leituras do mesmo feed
+FEED_POLL_DEFAULT_MINUTES = float(os.getenv("FEED_POLL_DEFAULT_MINUTES", "30"))  # Intervalo inicial, antes de conhecer o ritmo do feed
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", str(os.cpu_count() or 1)))  # Processos usados no modo "process"
 
 # Configurações do sistema
 DEBUG_MODE = os.getenv("DEBUG_MODE", "False").lower() == "true"
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
 CACHE_DIR = os.path.join(DATA_DIR, "cache")
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")  # Relatórios gerados com --profile
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "10"))  # Itens mais lentos de cada tipo listados no relatório
 
 # Criar diretórios necessários se não existirem
 for directory in [DATA_DIR, CACHE_DIR]:
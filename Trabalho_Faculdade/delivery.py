@@ -0,0 +1,212 @@
+import time
+import queue
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import profiling
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("delivery")
+
+# Uma mensagem a ser entregue; `key` identifica o envio (ex.: ID do usuário)
+DeliveryJob = namedtuple("DeliveryJob", ["key", "phone", "message", "data"])
+
+
+class TokenBucket:
+    """Limitador de taxa: libera no máximo `rate` envios por segundo, com rajadas de até `capacity`"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Aguarda até haver uma ficha disponível e a consome"""
+        if self.rate <= 0:
+            return
+        
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                wait = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait)
+
+
+class DeliveryReport:
+    """Resultado de uma rodada de envios"""
+    
+    def __init__(self):
+        self.sent = 0
+        self.failed = 0
+        self.sent_by_fallback = 0
+        self.fallback_pending = 0
+        self.failures = []
+        self.started_at = time.monotonic()
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+    
+    def defer(self, job):
+        """Mensagem passada ao método alternativo; o resultado chega depois, por record()"""
+        with self._lock:
+            self.fallback_pending += 1
+    
+    def record(self, job, success, fallback=False):
+        with self._lock:
+            if fallback:
+                self.fallback_pending -= 1
+            if success:
+                self.sent += 1
+                if fallback:
+                    self.sent_by_fallback += 1
+            else:
+                self.failed += 1
+                self.failures.append(job.key)
+    
+    def finish(self):
+        self.elapsed = time.monotonic() - self.started_at
+    
+    @property
+    def throughput(self):
+        """Mensagens processadas por segundo"""
+        total = self.sent + self.failed
+        return total / self.elapsed if self.elapsed else 0.0
+    
+    def as_dict(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "sent_by_fallback": self.sent_by_fallback,
+            "fallback_pending": self.fallback_pending,
+            "failures": list(self.failures),
+            "elapsed_seconds": round(self.elapsed, 3),
+            "messages_per_second": round(self.throughput, 2)
+        }
+
+
+class DeliveryEngine:
+    """Envia mensagens em paralelo respeitando o limite de mensagens por segundo do número remetente
+    
+    Se o remetente tiver um transporte alternativo (pywhatkit, que automatiza o
+    navegador e leva quase um minuto por mensagem), as mensagens que falharem no
+    transporte principal vão para uma fila separada, atendida por uma única
+    thread que dura enquanto o engine existir; assim nem os demais envios nem
+    quem chamou run() esperam pelo método alternativo.
+    """
+    
+    def __init__(self, sender, workers=None, rate=None, burst=None):
+        self.sender = sender
+        self.workers = max(1, workers or config.DELIVERY_WORKERS)
+        self.bucket = TokenBucket(
+            rate if rate is not None else config.DELIVERY_RATE_PER_SECOND,
+            burst or config.DELIVERY_BURST
+        )
+        
+        # Fila do método alternativo: itens (job, report, on_result), atendidos por uma única thread
+        self._fallback_lane = queue.Queue()
+        self._fallback_thread = None
+        self._fallback_lock = threading.Lock()
+    
+    def _uses_fallback_lane(self):
+        return getattr(self.sender, "fallback_transport", None) is not None
+    
+    def _start_fallback_lane(self):
+        """Inicia (uma vez) a thread que atende a fila do método alternativo"""
+        with self._fallback_lock:
+            if self._fallback_thread is None or not self._fallback_thread.is_alive():
+                self._fallback_thread = threading.Thread(
+                    target=self._run_fallback_lane, name="delivery-fallback", daemon=True
+                )
+                self._fallback_thread.start()
+    
+    def _deliver(self, job, report, on_result, use_fallback):
+        self.bucket.acquire()
+        try:
+            with profiling.span("send", job.key, lane="primary"):
+                if not use_fallback:
+                    success = self.sender.send_message(job.phone, job.message)
+                else:
+                    success = self.sender.send_primary(job.phone, job.message)
+        except Exception as e:
+            logger.error(f"Erro ao enviar mensagem para {job.phone}: {e}")
+            success = False
+        
+        if not success and use_fallback:
+            report.defer(job)
+            self._fallback_lane.put((job, report, on_result))
+            return
+        
+        self._finish(job, success, report, on_result)
+    
+    def _run_fallback_lane(self):
+        """Envia, uma de cada vez, as mensagens que falharam no transporte principal"""
+        while True:
+            job, report, on_result = self._fallback_lane.get()
+            try:
+                with profiling.span("send", job.key, lane="fallback"):
+                    success = self.sender.send_fallback(job.phone, job.message)
+            except Exception as e:
+                logger.error(f"Erro ao enviar mensagem para {job.phone} pelo método alternativo: {e}")
+                success = False
+            
+            try:
+                self._finish(job, success, report, on_result, fallback=True)
+            finally:
+                self._fallback_lane.task_done()
+    
+    def wait_fallback(self):
+        """Aguarda o método alternativo terminar as mensagens da fila (ex.: antes de encerrar o processo)"""
+        self._fallback_lane.join()
+    
+    def _finish(self, job, success, report, on_result, fallback=False):
+        report.record(job, success, fallback=fallback)
+        
+        if on_result:
+            try:
+                on_result(job, success)
+            except Exception as e:
+                logger.error(f"Erro ao registrar resultado do envio {job.key}: {e}")
+    
+    def run(self, jobs, on_result=None, report=None):
+        """Entrega todas as mensagens e retorna um DeliveryReport
+        
+        `on_result(job, success)` é chamado (na thread do envio) logo após cada mensagem.
+        Se `report` for informado, os resultados são acumulados nele.
+        
+        As mensagens passadas ao método alternativo não são aguardadas: o resultado
+        delas chega depois, por `on_result`, na thread do método alternativo, e
+        `report.fallback_pending` indica quantas ainda estão na fila.
+        """
+        if report is None:
+            report = DeliveryReport()
+        
+        use_fallback = self._uses_fallback_lane()
+        if use_fallback:
+            self._start_fallback_lane()
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="delivery") as executor:
+            for job in jobs:
+                executor.submit(self._deliver, job, report, on_result, use_fallback)
+        
+        report.finish()
+        logger.info(
+            f"Rodada de envios concluída: {report.sent} enviadas, {report.failed} falhas, "
+            f"{report.fallback_pending} aguardando o método alternativo "
+            f"em {report.elapsed:.1f}s ({report.throughput:.2f} mensagens/s)"
+        )
+        return report
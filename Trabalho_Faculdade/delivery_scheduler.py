@@ -0,0 +1,248 @@
+import zlib
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("delivery_scheduler")
+
+# Dias da semana (0 = segunda) em que cada frequência recebe notícias
+FREQUENCY_WEEKDAYS = {
+    "daily": {0, 1, 2, 3, 4, 5, 6},
+    "weekly": {0},
+    "biweekly": {0, 3},
+}
+
+# Espera máxima entre verificações, para acompanhar ajustes no relógio do sistema
+MAX_SLEEP_SECONDS = 3600
+
+
+def parse_send_time(value):
+    """Converte "HH:MM" em (hora, minuto); retorna None se o horário for inválido"""
+    try:
+        hour, minute = (int(part) for part in str(value).split(":"))
+    except ValueError:
+        return None
+    
+    if 0 <= hour < 24 and 0 <= minute < 60:
+        return hour, minute
+    return None
+
+
+def get_timezone(name):
+    """Retorna o fuso horário pelo nome (ex.: "America/Sao_Paulo") ou None se não existir"""
+    try:
+        return ZoneInfo(str(name))
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def matches_frequency(frequency, weekday):
+    """Verifica se a frequência do usuário inclui o dia da semana (0 = segunda)"""
+    return weekday in FREQUENCY_WEEKDAYS.get(frequency, FREQUENCY_WEEKDAYS["daily"])
+
+
+class DeliveryScheduler:
+    """
+    Agendador baseado em fila de prioridade (heap): cada usuário é agendado no seu
+    horário e fuso, e o agendador dorme exatamente até o próximo compromisso
+    """
+    
+    def __init__(self, users, send_batch, spread_minutes=None, default_timezone=None):
+        self.users = users
+        self.send_batch = send_batch  # função que recebe a lista de IDs com envio vencido
+        self.spread_minutes = max(0, int(spread_minutes if spread_minutes is not None else config.DELIVERY_SPREAD_MINUTES))
+        self.default_timezone = get_timezone(default_timezone or config.DEFAULT_TIMEZONE) or ZoneInfo("UTC")
+        
+        # Entradas do heap: (timestamp, sequência, tipo, chave)
+        self._heap = []
+        self._sequence = 0
+        # Próximo envio válido de cada usuário; entradas antigas no heap são ignoradas
+        self._user_next = {}
+        # Tarefas periódicas: nome -> (função, função que calcula a próxima execução)
+        self._tasks = {}
+        
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+    
+    # ----- Usuários -----
+    
+    def next_send_time(self, user_data, after):
+        """Calcula o próximo envio do usuário depois de `after` (datetime com fuso)"""
+        tz = get_timezone(user_data.get("timezone") or self.default_timezone.key)
+        if tz is None:
+            logger.warning(f"Fuso horário inválido para o usuário {user_data.get('id')}, usando {self.default_timezone.key}")
+            tz = self.default_timezone
+        
+        send_time = parse_send_time(user_data.get("send_time") or config.DEFAULT_SEND_TIME)
+        if send_time is None:
+            logger.warning(f"Horário inválido para o usuário {user_data.get('id')}, usando {config.DEFAULT_SEND_TIME}")
+            send_time = parse_send_time(config.DEFAULT_SEND_TIME)
+        
+        # Deslocamento fixo por usuário dentro da janela, para não enviar tudo no mesmo minuto
+        offset = timedelta(minutes=self._spread_offset(user_data.get("id")))
+        frequency = user_data.get("frequency", "daily")
+        
+        local_after = after.astimezone(tz)
+        for days in range(8):
+            day = local_after.date() + timedelta(days=days)
+            if not matches_frequency(frequency, day.weekday()):
+                continue
+            
+            candidate = datetime(day.year, day.month, day.day, send_time[0], send_time[1], tzinfo=tz) + offset
+            if candidate > local_after:
+                return candidate
+        
+        return None
+    
+    def _spread_offset(self, user_id):
+        """Minuto da janela de envio reservado ao usuário (sempre o mesmo para o mesmo ID)"""
+        if not self.spread_minutes or user_id is None:
+            return 0
+        return zlib.crc32(str(user_id).encode("utf-8")) % self.spread_minutes
+    
+    def reschedule(self, user_id, after=None):
+        """(Re)agenda o próximo envio do usuário; chamar sempre que os dados dele mudarem"""
+        user_data = self.users.get(user_id)
+        
+        with self._lock:
+            if not user_data or not user_data.get("active", True):
+                self._user_next.pop(user_id, None)
+                return None
+            
+            when = self.next_send_time(user_data, after or datetime.now(self.default_timezone))
+            if when is None:
+                self._user_next.pop(user_id, None)
+                return None
+            
+            self._user_next[user_id] = when.timestamp()
+            self._push(when.timestamp(), "user", user_id)
+        
+        self._wakeup.set()
+        return when
+    
+    def remove(self, user_id):
+        """Cancela os envios agendados do usuário"""
+        with self._lock:
+            self._user_next.pop(user_id, None)
+    
+    def schedule_all(self):
+        """Agenda todos os usuários cadastrados"""
+        for user_id in list(self.users):
+            self.reschedule(user_id)
+    
+    def next_delivery(self):
+        """Data e hora do próximo envio agendado, ou None"""
+        with self._lock:
+            if not self._user_next:
+                return None
+            return datetime.fromtimestamp(min(self._user_next.values()), self.default_timezone)
+    
+    # ----- Tarefas periódicas -----
+    
+    def every(self, minutes, func, name=None):
+        """Executa `func` a cada `minutes` minutos"""
+        interval = timedelta(minutes=minutes)
+        self._add_task(name or func.__name__, func, lambda after: after + interval)
+    
+    def daily_at(self, time_str, func, name=None):
+        """Executa `func` todos os dias no horário "HH:MM" do fuso padrão"""
+        hour, minute = parse_send_time(time_str)
+        
+        def next_run(after):
+            local_after = after.astimezone(self.default_timezone)
+            candidate = local_after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if candidate <= local_after:
+                candidate = datetime(candidate.year, candidate.month, candidate.day, hour, minute,
+                                     tzinfo=self.default_timezone) + timedelta(days=1)
+            return candidate
+        
+        self._add_task(name or func.__name__, func, next_run)
+    
+    def _add_task(self, name, func, next_run):
+        with self._lock:
+            self._tasks[name] = (func, next_run)
+            self._push(next_run(datetime.now(self.default_timezone)).timestamp(), "task", name)
+        self._wakeup.set()
+    
+    # ----- Execução -----
+    
+    def _push(self, timestamp, kind, key):
+        self._sequence += 1
+        heapq.heappush(self._heap, (timestamp, self._sequence, kind, key))
+    
+    def _pop_due(self):
+        """Retira do heap tudo o que já venceu; retorna (usuários, tarefas, segundos até o próximo)"""
+        now = datetime.now(self.default_timezone)
+        now_ts = now.timestamp()
+        due_users = []
+        due_tasks = []
+        
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now_ts:
+                timestamp, _, kind, key = heapq.heappop(self._heap)
+                
+                if kind == "user":
+                    # Entrada substituída por um reagendamento ou usuário removido
+                    if self._user_next.get(key) != timestamp:
+                        continue
+                    del self._user_next[key]
+                    due_users.append(key)
+                elif key in self._tasks:
+                    func, next_run = self._tasks[key]
+                    due_tasks.append(func)
+                    self._push(next_run(now).timestamp(), "task", key)
+            
+            timeout = self._heap[0][0] - now_ts if self._heap else None
+        
+        return due_users, due_tasks, timeout
+    
+    def run_pending(self):
+        """Executa os envios e tarefas vencidos; retorna os segundos até o próximo (ou None)"""
+        due_users, due_tasks, timeout = self._pop_due()
+        
+        if due_users:
+            # Agendar o próximo envio antes de enviar, para não perder o usuário se o envio falhar
+            for user_id in due_users:
+                self.reschedule(user_id)
+            
+            logger.info(f"Enviando notícias agendadas para {len(due_users)} usuários")
+            try:
+                self.send_batch(due_users)
+            except Exception as e:
+                logger.error(f"Erro ao enviar notícias agendadas: {e}")
+        
+        for func in due_tasks:
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"Erro ao executar tarefa agendada: {e}")
+        
+        if due_users or due_tasks:
+            return 0
+        return timeout
+    
+    def run(self):
+        """Loop principal: dorme até o próximo compromisso ou até um reagendamento"""
+        logger.info("Agendador de envios iniciado")
+        
+        while not self._stop.is_set():
+            self._wakeup.clear()
+            timeout = self.run_pending()
+            if timeout == 0:
+                continue
+            
+            self._wakeup.wait(MAX_SLEEP_SECONDS if timeout is None else min(timeout, MAX_SLEEP_SECONDS))
+    
+    def stop(self):
+        """Interrompe o loop principal"""
+        self._stop.set()
+        self._wakeup.set()
@@ -1,8 +1,10 @@
 import re
+import time
 import logging
-import nltk
-from sklearn.feature_extraction.text import TfidfVectorizer
-from textblob import TextBlob
+import threading
+from functools import lru_cache
+from text_analysis import analyze_article, ensure_nltk_resources
+import metrics
 import config
 
 # Configurar logging
@@ -12,118 +14,223 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fake_news_detector")
 
-# Garantir que os recursos necessários do NLTK estejam disponíveis
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+@lru_cache(maxsize=1)
+def get_stopwords():
+    """Lista de stopwords em português (o NLTK só é carregado na primeira chamada)"""
+    try:
+        ensure_nltk_resources('tokenizers/punkt', 'corpora/stopwords')
+        import nltk
+        return frozenset(nltk.corpus.stopwords.words('portuguese'))
+    except Exception:
+        logger.warning("Não foi possível carregar stopwords em português, usando lista vazia.")
+        return frozenset()
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# Pontuação a partir da qual a probabilidade de fake news é considerada 1.0
+MAX_REASONABLE_SCORE = 20
+
+# Padrões de títulos clickbait (comparados sem diferenciar maiúsculas e minúsculas)
+CLICKBAIT_PATTERNS = [
+    r"você não vai acreditar",
+    r"incrível",
+    r"chocante",
+    r"surpreendente",
+    r"impressionante",
+    r"nunca imaginaria",
+    r"assustador",
+    r"o que aconteceu depois",
+    r"\d+ (coisas|fatos|razões)",
+    r"segredo",
+    r"revelado",
+    r"médicos odeiam",
+]
+
+
+class MultiPatternMatcher:
+    """Encontra em uma única passada pelo texto todos os padrões de uma lista
+    
+    Com `literal=True` os padrões são frases comparadas em minúsculas e são
+    reunidos em uma árvore de prefixos (como no Aho-Corasick); caso contrário
+    são expressões regulares combinadas em uma única regex. Em ambos os casos a
+    regex é compilada uma vez e testada em cada posição do texto.
+    
+    A alternância informa só um padrão por posição; no modo regex, as posições
+    encontradas são conferidas também com os demais padrões, para que padrões que
+    começam no mesmo ponto (ex.: "ab" e "abc") sejam todos reportados.
+    """
+    
+    def __init__(self, patterns, literal=False):
+        self.patterns = list(patterns)
+        self.literal = literal
+        self._implied = {}
+        self._pattern_regexes = []
+        
+        if literal:
+            keywords = [pattern.lower() for pattern in self.patterns]
+            body = self._build_trie_regex(keywords)
+            flags = 0
+            # A regex informa apenas a frase mais longa em cada posição; as frases
+            # contidas nela também estão presentes no texto
+            for i, keyword in enumerate(keywords):
+                self._implied[i] = [j for j, other in enumerate(keywords)
+                                    if j != i and other and other in keyword]
+        else:
+            body = "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(self.patterns))
+            flags = re.IGNORECASE
+            self._pattern_regexes = [re.compile(pattern, flags) for pattern in self.patterns]
+        
+        self._regex = re.compile(f"(?=(?:{body}))", flags) if body else None
+    
+    @staticmethod
+    def _build_trie_regex(keywords):
+        """Monta uma regex em forma de árvore de prefixos; cada frase termina em um grupo vazio nomeado"""
+        trie = {}
+        for i, keyword in enumerate(keywords):
+            if not keyword:
+                continue
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node.setdefault(None, i)
+        
+        def to_regex(node):
+            # Continuações antes do fim da frase, para preferir a mais longa
+            branches = [re.escape(char) + to_regex(child)
+                        for char, child in sorted(node.items(), key=lambda item: str(item[0]))
+                        if char is not None]
+            if None in node:
+                branches.append(f"(?P<p{node[None]}>)")
+            if len(branches) == 1:
+                return branches[0]
+            return "(?:" + "|".join(branches) + ")"
+        
+        return to_regex(trie) if trie else ""
+    
+    def find(self, text, lowered=False):
+        """Retorna os padrões encontrados no texto, na ordem da lista original
+        
+        Se `lowered` for True, o texto já foi convertido para minúsculas.
+        """
+        if self._regex is None:
+            return []
+        
+        if self.literal and not lowered:
+            text = text.lower()
+        
+        found = set()
+        for match in self._regex.finditer(text):
+            index = int(match.lastgroup[1:])
+            found.add(index)
+            found.update(self._implied.get(index, ()))
+            
+            # Outros padrões que também casam nesta posição
+            if self._pattern_regexes and len(found) < len(self.patterns):
+                position = match.start()
+                for i, pattern_regex in enumerate(self._pattern_regexes):
+                    if i not in found and pattern_regex.match(text, position):
+                        found.add(i)
+        
+        return [self.patterns[i] for i in sorted(found)]
+
+
+@lru_cache(maxsize=None)
+def get_matcher(patterns, literal=False):
+    """Retorna o matcher compilado para a tupla de padrões, reaproveitando-o entre chamadas"""
+    return MultiPatternMatcher(patterns, literal=literal)
 
-# Lista de stopwords em português
-try:
-    STOPWORDS = set(nltk.corpus.stopwords.words('portuguese'))
-except:
-    logger.warning("Não foi possível carregar stopwords em português, usando lista vazia.")
-    STOPWORDS = set()
 
 class FakeNewsDetector:
     def __init__(self):
         self.suspicious_keywords = config.FAKE_NEWS_KEYWORDS
-        self.vectorizer = TfidfVectorizer(stop_words=list(STOPWORDS))
+        self.keyword_matcher = get_matcher(tuple(self.suspicious_keywords), literal=True)
+        self.clickbait_matcher = get_matcher(tuple(CLICKBAIT_PATTERNS))
+        self._vectorizer = None
+    
+    @property
+    def vectorizer(self):
+        """Vetorizador TF-IDF, criado apenas quando for usado pela primeira vez"""
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self._vectorizer = TfidfVectorizer(stop_words=list(get_stopwords()))
+        return self._vectorizer
 
     def check_suspicious_phrases(self, text):
         """Verifica se o texto contém frases suspeitas comuns em fake news"""
-        text = text.lower()
-        score = 0
-        matches = []
-        
-        for keyword in self.suspicious_keywords:
-            if keyword.lower() in text:
-                score += 1
-                matches.append(keyword)
-        
-        return score, matches
+        matches = self.keyword_matcher.find(text)
+        return len(matches), matches
     
     def check_exclamation_marks(self, text):
         """Conta pontos de exclamação, que costumam ser excessivos em fake news"""
-        count = text.count("!")
+        return self._exclamation_score(text.count("!"), len(text.split()))
+    
+    @staticmethod
+    def _exclamation_score(count, word_count):
         if count > 3:
-            return (count / len(text.split())) * 10  # Normalizar pela quantidade de palavras
+            return (count / word_count) * 10  # Normalizar pela quantidade de palavras
         return 0
     
     def check_all_caps(self, text):
         """Verifica se há uso excessivo de PALAVRAS EM MAIÚSCULAS"""
         words = text.split()
         all_caps_count = sum(1 for word in words if word.isupper() and len(word) > 3)
+        return self._all_caps_score(all_caps_count, len(words))
+    
+    @staticmethod
+    def _all_caps_score(all_caps_count, word_count):
         if all_caps_count > 0:
-            return (all_caps_count / len(words)) * 10  # Normalizado pela quantidade de palavras
+            return (all_caps_count / word_count) * 10  # Normalizado pela quantidade de palavras
         return 0
     
     def check_clickbait_title(self, title):
         """Verifica se o título parece ser clickbait"""
-        clickbait_patterns = [
-            r"(?i)você não vai acreditar",
-            r"(?i)incrível",
-            r"(?i)chocante",
-            r"(?i)surpreendente",
-            r"(?i)impressionante",
-            r"(?i)nunca imaginaria",
-            r"(?i)assustador",
-            r"(?i)o que aconteceu depois",
-            r"(?i)\d+ (coisas|fatos|razões)",
-            r"(?i)segredo",
-            r"(?i)revelado",
-            r"(?i)médicos odeiam",
-        ]
-        
-        score = 0
-        for pattern in clickbait_patterns:
-            if re.search(pattern, title):
-                score += 1
-        
-        return score
+        return len(self.clickbait_matcher.find(title))
     
     def analyze_sentiment(self, text):
         """Analisa se o sentimento do texto é muito extremo (positivo ou negativo)"""
+        from textblob import TextBlob
         blob = TextBlob(text)
-        sentiment = blob.sentiment.polarity
-        
+        return self._is_extreme_sentiment(blob.sentiment.polarity)
+    
+    @staticmethod
+    def _is_extreme_sentiment(sentiment):
         # Sentimentos extremos (muito positivo ou muito negativo) são suspeitos
         return abs(sentiment) > 0.8
     
-    def evaluate_text(self, title, content):
-        """Avalia o texto para determinar a probabilidade de ser fake news"""
-        # Inicializar pontuação (quanto maior, mais suspeito)
+    def _score(self, title, content):
+        """Calcula a pontuação de suspeita do texto (quanto maior, mais suspeito)"""
         fake_score = 0
         
+        # Tokenização e sentimento calculados uma vez por artigo (com cache)
+        analysis = analyze_article(title, content)
+        
         # 1. Verificar palavras-chave suspeitas
-        keyword_score, matches = self.check_suspicious_phrases(title + " " + content)
-        fake_score += keyword_score * 2  # Peso maior para palavras-chave
+        matches = self.keyword_matcher.find(analysis.lowered, lowered=True)
+        fake_score += len(matches) * 2  # Peso maior para palavras-chave
         
         # 2. Verificar excesso de pontos de exclamação
-        exclamation_score = self.check_exclamation_marks(title + " " + content)
-        fake_score += exclamation_score
+        fake_score += self._exclamation_score(analysis.exclamation_count, analysis.word_count)
         
         # 3. Verificar uso excessivo de maiúsculas
-        caps_score = self.check_all_caps(title + " " + content)
-        fake_score += caps_score
+        fake_score += self._all_caps_score(analysis.all_caps_count, analysis.word_count)
         
         # 4. Verificar título clickbait
         clickbait_score = self.check_clickbait_title(title)
         fake_score += clickbait_score * 2  # Peso maior para títulos clickbait
         
         # 5. Verificar sentimento extremo
-        if self.analyze_sentiment(title + " " + content):
+        if self._is_extreme_sentiment(analysis.sentiment):
             fake_score += 2
         
+        return fake_score, matches
+    
+    def evaluate_text(self, title, content):
+        """Avalia o texto para determinar a probabilidade de ser fake news"""
+        start = time.perf_counter()
+        fake_score, matches = self._score(title, content)
+        
         # Calcular probabilidade (normalizada para 0-1)
-        # Pontuação máxima possível considerando os pesos
-        max_possible_score = len(self.suspicious_keywords) * 2 + 10 + 10 + 12 * 2 + 2
-        probability = min(fake_score / 20, 1.0)  # Normaliza para um máximo razoável
+        probability = min(fake_score / MAX_REASONABLE_SCORE, 1.0)
+        metrics.FAKE_NEWS_EVALUATE_SECONDS.observe(time.perf_counter() - start, method="text")
+        metrics.FAKE_NEWS_EVALUATED.inc()
         
         # Registrar o resultado
         if fake_score > 0:
@@ -132,12 +239,45 @@ class FakeNewsDetector:
                 logger.info(f"Termos suspeitos encontrados: {', '.join(matches)}")
         
         return probability
+    
+    def evaluate_batch(self, titles, contents):
+        """Avalia vários textos de uma vez e retorna um array com a probabilidade de cada um ser fake news"""
+        import numpy as np
+        
+        start = time.perf_counter()
+        scores = np.array(
+            [self._score(title, content)[0] for title, content in zip(titles, contents)],
+            dtype=float
+        )
+        probabilities = np.minimum(scores / MAX_REASONABLE_SCORE, 1.0)
+        metrics.FAKE_NEWS_EVALUATE_SECONDS.observe(time.perf_counter() - start, method="batch")
+        metrics.FAKE_NEWS_EVALUATED.inc(len(scores))
+        
+        suspicious = int(np.count_nonzero(scores))
+        if suspicious:
+            logger.info(f"Análise de fake news em lote: {suspicious} de {len(scores)} textos com pontuação suspeita")
+        
+        return probabilities
+
+# Detector compartilhado, criado na primeira verificação
+_shared_detector = None
+_shared_detector_lock = threading.Lock()
+
+
+def get_detector():
+    """Retorna a instância compartilhada do detector, criando-a se necessário"""
+    global _shared_detector
+    if _shared_detector is None:
+        with _shared_detector_lock:
+            if _shared_detector is None:
+                _shared_detector = FakeNewsDetector()
+    return _shared_detector
+
 
 # Função auxiliar para verificar se uma notícia é confiável
 def verify_news(title, content):
     """Verifica se uma notícia é confiável para ser enviada aos usuários"""
-    detector = FakeNewsDetector()
-    fake_probability = detector.evaluate_text(title, content)
+    fake_probability = get_detector().evaluate_text(title, content)
     
     # Se a probabilidade for maior que o limite configurado, consideramos como potencial fake news
     is_reliable = fake_probability < (1 - config.MIN_CONFIDENCE_SCORE)
@@ -148,6 +288,19 @@ def verify_news(title, content):
     return is_reliable
 
 
+def verify_news_batch(titles, contents):
+    """Verifica várias notícias de uma vez; retorna uma lista indicando quais são confiáveis"""
+    titles = list(titles)
+    fake_probabilities = get_detector().evaluate_batch(titles, contents)
+    reliable = fake_probabilities < (1 - config.MIN_CONFIDENCE_SCORE)
+    
+    for title, fake_probability, is_reliable in zip(titles, fake_probabilities, reliable):
+        if not is_reliable:
+            logger.warning(f"Potencial fake news detectada (pontuação: {fake_probability:.2f}): {title}")
+    
+    return [bool(is_reliable) for is_reliable in reliable]
+
+
 # Para testes
 if __name__ == "__main__":
     detector = FakeNewsDetector()
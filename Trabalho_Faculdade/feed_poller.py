@@ -0,0 +1,137 @@
+import os
+import json
+import time
+import heapq
+import logging
+import threading
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("feed_poller")
+
+# Quantas entradas recentes são usadas para estimar o ritmo de publicação do feed
+SAMPLE_ENTRIES = 20
+
+# Peso da nova estimativa na média com o intervalo anterior
+SMOOTHING = 0.5
+
+
+def estimate_interval(published, min_interval, max_interval):
+    """Intervalo médio (s) entre as publicações mais recentes do feed, ou None sem datas suficientes"""
+    times = sorted(timestamp for timestamp in published if timestamp is not None)[-SAMPLE_ENTRIES:]
+    if len(times) < 2:
+        return None
+    
+    average_gap = (times[-1] - times[0]) / (len(times) - 1)
+    return min(max_interval, max(min_interval, average_gap))
+
+
+class FeedPoller:
+    """
+    Lê os feeds de config.NEWS_SOURCES continuamente, cada um no seu ritmo
+    
+    O intervalo de cada feed é aprendido a partir das datas das entradas: feeds que
+    publicam muito são lidos com frequência e feeds lentos raramente. Os artigos novos
+    são extraídos, verificados e gravados assim que aparecem.
+    """
+    
+    def __init__(self, news_fetcher, min_minutes=None, max_minutes=None, default_minutes=None,
+                 limit=10, state_file=None):
+        self.news_fetcher = news_fetcher
+        self.min_interval = 60 * (min_minutes or config.FEED_POLL_MIN_MINUTES)
+        self.max_interval = 60 * (max_minutes or config.FEED_POLL_MAX_MINUTES)
+        self.default_interval = 60 * (default_minutes or config.FEED_POLL_DEFAULT_MINUTES)
+        self.limit = limit
+        self.state_file = state_file or os.path.join(config.CACHE_DIR, "feed_poller.json")
+        
+        # Estado de cada feed: {url: {"interval": segundos, "last_poll": timestamp}}
+        self.state = self._load_state()
+        self._heap = []
+        self._stop = threading.Event()
+    
+    def _load_state(self):
+        """Carrega os intervalos aprendidos em execuções anteriores"""
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"Erro ao carregar estado dos feeds: {e}")
+        return {}
+    
+    def _save_state(self):
+        """Salva os intervalos aprendidos"""
+        try:
+            with open(self.state_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2)
+        except Exception as e:
+            logger.error(f"Erro ao salvar estado dos feeds: {e}")
+    
+    def feeds(self):
+        """Todos os feeds configurados, sem repetição"""
+        return list(dict.fromkeys(url for urls in config.NEWS_SOURCES.values() for url in urls))
+    
+    def _schedule_all(self):
+        """Monta a fila de prioridade com a próxima leitura de cada feed"""
+        now = time.time()
+        self._heap = []
+        for source_url in self.feeds():
+            feed_state = self.state.get(source_url, {})
+            next_poll = feed_state.get("last_poll", 0) + feed_state.get("interval", self.default_interval)
+            heapq.heappush(self._heap, (max(now, next_poll), source_url))
+    
+    def poll(self, source_url):
+        """Lê um feed, processa os artigos novos e ajusta o intervalo; retorna quantos artigos eram novos"""
+        feed_state = self.state.setdefault(source_url, {"interval": self.default_interval})
+        interval = feed_state.get("interval", self.default_interval)
+        new_count = 0
+        
+        try:
+            links, published, modified = self.news_fetcher.fetch_feed_entries(source_url)
+            new_articles = self.news_fetcher.ingest_articles(links[:self.limit])
+            new_count = len(new_articles)
+            
+            # Estimar pelo ritmo de publicação; sem datas, acelerar quando há novidades e desacelerar quando não há
+            estimate = estimate_interval(published, self.min_interval, self.max_interval) if modified else None
+            if estimate is not None:
+                interval = SMOOTHING * estimate + (1 - SMOOTHING) * interval
+            elif new_count:
+                interval = interval / 2
+            else:
+                interval = interval * 1.5
+        except Exception as e:
+            logger.error(f"Erro ao ler o feed {source_url}: {e}")
+            interval = interval * 2
+        
+        feed_state["interval"] = min(self.max_interval, max(self.min_interval, interval))
+        feed_state["last_poll"] = time.time()
+        self.news_fetcher.save_feed_validators()
+        self._save_state()
+        
+        logger.info(f"{new_count} artigos novos em {source_url}; próxima leitura em "
+                    f"{feed_state['interval'] / 60:.0f} min")
+        return new_count
+    
+    def run(self):
+        """Loop principal: dorme até o próximo feed vencer, lê e reagenda"""
+        self._schedule_all()
+        logger.info(f"Leitura contínua de {len(self._heap)} feeds iniciada")
+        
+        while not self._stop.is_set() and self._heap:
+            next_poll, source_url = self._heap[0]
+            wait = next_poll - time.time()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            
+            heapq.heappop(self._heap)
+            self.poll(source_url)
+            heapq.heappush(self._heap, (time.time() + self.state[source_url]["interval"], source_url))
+    
+    def stop(self):
+        """Interrompe o loop principal"""
+        self._stop.set()
@@ -0,0 +1,108 @@
+import os
+import json
+import sqlite3
+import logging
+import threading
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("message_log")
+
+
+class MessageLog:
+    """Histórico de mensagens enviadas, gravado em SQLite apenas por acréscimo
+    
+    Cada envio grava uma única linha; o índice por destinatário permite ler o
+    histórico de um número sem carregar o histórico dos demais.
+    """
+    
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(config.DATA_DIR, "message_logs.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Cria a tabela de mensagens, se ainda não existir"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recipient TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    type TEXT,
+                    content_summary TEXT,
+                    success INTEGER NOT NULL,
+                    error TEXT
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_messages_recipient ON messages (recipient, id)"
+            )
+    
+    def append(self, recipient, entry):
+        """Acrescenta um registro ao histórico do destinatário"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO messages (recipient, timestamp, type, content_summary, success, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (recipient, entry["timestamp"], entry["type"], entry["content_summary"],
+                     1 if entry["success"] else 0, entry["error"])
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao registrar mensagem: {e}")
+    
+    def history(self, recipient):
+        """Retorna os registros de um destinatário, do mais antigo para o mais recente"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, type, content_summary, success, error FROM messages "
+                "WHERE recipient = ? ORDER BY id", (recipient,)
+            ).fetchall()
+        
+        return [{
+            "timestamp": row["timestamp"],
+            "type": row["type"],
+            "content_summary": row["content_summary"],
+            "success": bool(row["success"]),
+            "error": row["error"]
+        } for row in rows]
+    
+    def import_json(self, json_file):
+        """Importa o histórico antigo (message_logs.json), renomeando o arquivo depois"""
+        if not os.path.exists(json_file):
+            return
+        
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                old_logs = json.load(f)
+            
+            rows = []
+            for recipient, entries in old_logs.items():
+                for entry in entries:
+                    rows.append((recipient, entry.get("timestamp", ""), entry.get("type"),
+                                 entry.get("content_summary", ""), 1 if entry.get("success") else 0,
+                                 entry.get("error", "")))
+            
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO messages (recipient, timestamp, type, content_summary, success, error) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+            os.replace(json_file, json_file + ".importado")
+            logger.info(f"{len(rows)} registros importados de {json_file}")
+        except Exception as e:
+            logger.error(f"Erro ao importar histórico de mensagens: {e}")
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from delivery import DeliveryJob
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("message_queue")
+
+# Situações de uma mensagem na fila
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+
+class MessageQueue:
+    """Fila persistente (SQLite) de mensagens a enviar, com novas tentativas e dead-letter
+    
+    Cada mensagem tem uma chave única (`dedupe_key`): enfileirar de novo a mesma
+    chave não tem efeito, então uma rodada interrompida pode ser refeita sem
+    reenviar o que já foi entregue. Mensagens que falham são tentadas de novo
+    com espera exponencial; depois de `max_attempts` vão para a tabela dead_letters.
+    
+    Cada mensagem reservada para envio guarda o horário da reserva (`claimed_at`);
+    ela só volta para a fila depois que a reserva expira (`lease_seconds`), para
+    que um processo não reenvie mensagens que outro processo ainda está enviando.
+    """
+    
+    def __init__(self, db_path=None, max_attempts=None, backoff_seconds=None, backoff_max_seconds=None,
+                 lease_seconds=None):
+        self.db_path = db_path or os.path.join(config.DATA_DIR, "outbox.db")
+        self.max_attempts = max_attempts or config.QUEUE_MAX_ATTEMPTS
+        self.backoff_seconds = backoff_seconds if backoff_seconds is not None else config.QUEUE_BACKOFF_SECONDS
+        self.backoff_max_seconds = backoff_max_seconds or config.QUEUE_BACKOFF_MAX_SECONDS
+        self.lease_seconds = lease_seconds if lease_seconds is not None else config.QUEUE_CLAIM_LEASE_SECONDS
+        self._lock = threading.Lock()
+        self._drain_lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+    
+    def _create_tables(self):
+        """Cria as tabelas da fila, se ainda não existirem"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    dedupe_key TEXT NOT NULL UNIQUE,
+                    user_id TEXT,
+                    phone TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    data TEXT,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    claimed_at REAL,
+                    last_error TEXT,
+                    created_at TEXT NOT NULL,
+                    sent_at TEXT
+                )
+            """)
+            # Bancos criados antes da coluna claimed_at
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+            if "claimed_at" not in columns:
+                self._conn.execute("ALTER TABLE outbox ADD COLUMN claimed_at REAL")
+            
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_outbox_job ON outbox (job_id, status)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS dead_letters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    outbox_id INTEGER NOT NULL,
+                    job_id TEXT NOT NULL,
+                    user_id TEXT,
+                    phone TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    last_error TEXT,
+                    failed_at TEXT NOT NULL
+                )
+            """)
+    
+    def recover_expired(self):
+        """Devolve para a fila as mensagens cuja reserva expirou (ex.: o processo que as enviava parou)"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE outbox SET status = ?, claimed_at = NULL "
+                "WHERE status = ? AND (claimed_at IS NULL OR claimed_at < ?)",
+                (PENDING, SENDING, time.time() - self.lease_seconds)
+            )
+        if cursor.rowcount:
+            logger.warning(f"{cursor.rowcount} mensagens interrompidas voltaram para a fila")
+    
+    def enqueue(self, job_id, messages):
+        """Enfileira mensagens (dicionários com dedupe_key, user_id, phone, message e data)
+        
+        Retorna quantas mensagens foram de fato adicionadas; chaves repetidas são ignoradas.
+        """
+        now = time.time()
+        created_at = datetime.now().isoformat()
+        rows = [(
+            job_id, item["dedupe_key"], item.get("user_id"), item["phone"], item["message"],
+            json.dumps(item.get("data", {}), ensure_ascii=False), PENDING, now, created_at
+        ) for item in messages]
+        
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT OR IGNORE INTO outbox
+                    (job_id, dedupe_key, user_id, phone, message, data, status, next_attempt_at, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            added = self._conn.total_changes - before
+        
+        logger.info(f"{added} mensagens enfileiradas para {job_id} ({len(rows) - added} já estavam na fila)")
+        return added
+    
+    def existing_keys(self, job_id):
+        """Chaves já enfileiradas para o job (em qualquer situação)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT dedupe_key FROM outbox WHERE job_id = ?", (job_id,)
+            ).fetchall()
+        return {row["dedupe_key"] for row in rows}
+    
+    def claim_due(self, limit=500, job_id=None):
+        """Reserva as próximas mensagens prontas para envio e as retorna como DeliveryJobs
+        
+        A reserva só vale se a mensagem ainda estiver pendente, então dois processos
+        drenando a mesma fila (ex.: --web e --scheduler) nunca pegam a mesma mensagem.
+        """
+        now = time.time()
+        query = "SELECT * FROM outbox WHERE status = ? AND next_attempt_at <= ?"
+        params = [PENDING, now]
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        query += " ORDER BY next_attempt_at, id LIMIT ?"
+        params.append(limit)
+        
+        claimed = []
+        with self._lock, self._conn:
+            for row in self._conn.execute(query, params).fetchall():
+                cursor = self._conn.execute(
+                    "UPDATE outbox SET status = ?, claimed_at = ? WHERE id = ? AND status = ?",
+                    (SENDING, now, row["id"], PENDING)
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(row)
+        
+        jobs = []
+        for row in claimed:
+            data = json.loads(row["data"]) if row["data"] else {}
+            data.update({"outbox_id": row["id"], "job_id": row["job_id"], "user_id": row["user_id"]})
+            jobs.append(DeliveryJob(row["user_id"] or row["dedupe_key"], row["phone"], row["message"], data))
+        return jobs
+    
+    def mark_sent(self, outbox_id):
+        """Marca a mensagem como entregue"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, sent_at = ?, last_error = NULL WHERE id = ?",
+                (SENT, datetime.now().isoformat(), outbox_id)
+            )
+    
+    def mark_failed(self, outbox_id, error=""):
+        """Agenda uma nova tentativa com espera exponencial ou move a mensagem para dead_letters"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT * FROM outbox WHERE id = ?", (outbox_id,)).fetchone()
+            if row is None:
+                return
+            
+            attempts = row["attempts"] + 1
+            if attempts >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, last_error = ? WHERE id = ?",
+                    (DEAD, attempts, error, outbox_id)
+                )
+                self._conn.execute("""
+                    INSERT INTO dead_letters (outbox_id, job_id, user_id, phone, message, attempts, last_error, failed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (outbox_id, row["job_id"], row["user_id"], row["phone"], row["message"],
+                      attempts, error, datetime.now().isoformat()))
+                logger.error(f"Mensagem {outbox_id} para {row['phone']} desistida após {attempts} tentativas")
+            else:
+                delay = min(self.backoff_seconds * (2 ** (attempts - 1)), self.backoff_max_seconds)
+                self._conn.execute(
+                    "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                    (PENDING, attempts, error, time.time() + delay, outbox_id)
+                )
+                logger.warning(f"Mensagem {outbox_id} para {row['phone']} será tentada de novo em {delay:.0f}s")
+    
+    def counts(self, job_id=None):
+        """Quantidade de mensagens em cada situação (opcionalmente de um único job)"""
+        query = "SELECT status, COUNT(*) AS total FROM outbox"
+        params = []
+        if job_id is not None:
+            query += " WHERE job_id = ?"
+            params.append(job_id)
+        query += " GROUP BY status"
+        
+        totals = {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0}
+        with self._lock:
+            for row in self._conn.execute(query, params).fetchall():
+                totals[row["status"]] = row["total"]
+        return totals
+    
+    def unfinished_jobs(self, prefix=""):
+        """Jobs (cujo ID começa com `prefix`) que ainda têm mensagens pendentes ou em envio"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT job_id FROM outbox WHERE status IN (?, ?) AND job_id LIKE ? ORDER BY job_id",
+                (PENDING, SENDING, prefix + "%")
+            ).fetchall()
+        return [row["job_id"] for row in rows]
+    
+    def next_attempt_at(self, job_id=None):
+        """Timestamp da próxima mensagem pendente (opcionalmente de um único job), ou None"""
+        query = "SELECT MIN(next_attempt_at) AS next_at FROM outbox WHERE status = ?"
+        params = [PENDING]
+        if job_id is not None:
+            query += " AND job_id = ?"
+            params.append(job_id)
+        
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()["next_at"]
+    
+    def drain(self, engine, on_result=None, job_id=None, batch_size=500):
+        """Envia todas as mensagens prontas usando o DeliveryEngine e retorna um DeliveryReport
+        
+        Mensagens com nova tentativa agendada para depois ficam na fila para a próxima drenagem.
+        `on_result(job, success)` é chamado depois que o resultado é gravado na fila; para as
+        mensagens passadas ao método alternativo, isso acontece depois que drain() retorna
+        (até lá elas continuam como "sending").
+        """
+        def record(job, success):
+            if success:
+                self.mark_sent(job.data["outbox_id"])
+            else:
+                self.mark_failed(job.data["outbox_id"], "Falha no envio da mensagem")
+            if on_result:
+                on_result(job, success)
+        
+        def due_jobs():
+            while True:
+                jobs = self.claim_due(limit=batch_size, job_id=job_id)
+                if not jobs:
+                    return
+                yield from jobs
+        
+        # Uma única rodada do engine para todos os lotes; o método alternativo
+        # segue em segundo plano, então o lock não espera por ele
+        with self._drain_lock:
+            self.recover_expired()
+            return engine.run(due_jobs(), on_result=record)
+    
+    def close(self):
+        """Fecha a conexão com o banco"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,167 @@
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Limites (em segundos) dos intervalos dos histogramas de latência
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Todas as métricas criadas, na ordem em que aparecem em /api/metrics
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _escape(value):
+    """Escapa barras, aspas e quebras de linha no valor de um rótulo"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    """Monta o trecho {nome="valor",...} do formato de texto do Prometheus"""
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Base das métricas: nome, descrição, rótulos e valores por combinação de rótulos"""
+    
+    type_name = "untyped"
+    
+    def __init__(self, name, description, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        
+        with _registry_lock:
+            _registry.append(self)
+    
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    def render(self):
+        """Linhas da métrica no formato de texto do Prometheus"""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+    
+    def _render_samples(self, items):
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Contador que só aumenta (ex.: mensagens enviadas)"""
+    
+    type_name = "counter"
+    
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def _render_samples(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Histogram(Metric):
+    """Histograma de latências: contagem por intervalo, soma e total de medições"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value, **labels):
+        """Registra uma medição (em segundos)"""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [contagens por intervalo (o último é +Inf), soma, total]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    @contextmanager
+    def time(self, **labels):
+        """Mede o tempo do bloco `with` e registra no histograma"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+    
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render():
+    """Todas as métricas no formato de texto do Prometheus (usado em /api/metrics)"""
+    with _registry_lock:
+        metrics = list(_registry)
+    
+    lines = []
+    for metric in metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ----- Métricas de cada etapa -----
+
+FEED_FETCH_SECONDS = Histogram(
+    "infoidosos_feed_fetch_seconds", "Tempo para baixar e interpretar um feed RSS",
+    ["status"]
+)
+ARTICLE_STAGE_SECONDS = Histogram(
+    "infoidosos_article_stage_seconds", "Tempo de cada etapa do processamento de um artigo (download, parse, nlp)",
+    ["stage"]
+)
+ARTICLE_ERRORS = Counter(
+    "infoidosos_article_errors_total", "Artigos que falharam no download ou na extração",
+    ["stage"]
+)
+FAKE_NEWS_EVALUATE_SECONDS = Histogram(
+    "infoidosos_fake_news_evaluate_seconds", "Tempo da avaliação de fake news (por texto ou por lote)",
+    ["method"]
+)
+FAKE_NEWS_EVALUATED = Counter(
+    "infoidosos_fake_news_evaluated_total", "Textos avaliados pelo detector de fake news"
+)
+FORMAT_MESSAGE_SECONDS = Histogram(
+    "infoidosos_format_message_seconds", "Tempo para formatar as notícias de uma mensagem do WhatsApp",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+SEND_SECONDS = Histogram(
+    "infoidosos_send_seconds", "Tempo de envio de uma mensagem por transporte",
+    ["transport", "result"]
+)
@@ -1,17 +1,25 @@
 import feedparser
-import requests
-from bs4 import BeautifulSoup
-from newspaper import Article
-import pandas as pd
 import time
 import random
 import os
 import json
 import logging
+import calendar
+import atexit
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from textblob import TextBlob
-import nltk
-from fake_news_detector import verify_news
+from urllib.parse import urlparse
+from fake_news_detector import verify_news_batch
+from article_store import ArticleStore
+from url_dedupe import UrlDedupeSet
+import metrics
+import profiling
+from text_analysis import (analyze_article, store_analysis, topic_index, tokenize, matches_topic,
+                           ensure_nltk_resources)
 import config
 
 # Configurar logging
@@ -21,39 +29,170 @@ logging.basicConfig(
 )
 logger = logging.getLogger("news_fetcher")
 
-# Garantir que os pacotes nltk necessários estejam instalados
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    logger.info("Baixando recursos do NLTK...")
-    nltk.download('punkt')
+def extract_article(url, html):
+    """Extrai título, conteúdo, resumo e sentimento de um artigo já baixado
+    
+    Retorna o dicionário do artigo (ou None em caso de erro) e a análise de texto.
+    """
+    data, analysis, timings = extract_article_timed(url, html)
+    record_extraction_timings(timings)
+    return data, analysis
+
+
+def record_extraction_timings(timings):
+    """Registra nas métricas os tempos devolvidos por extract_article_timed"""
+    for stage in ("parse", "nlp"):
+        if stage in timings:
+            metrics.ARTICLE_STAGE_SECONDS.observe(timings[stage], stage=stage)
+    if "failed_stage" in timings:
+        metrics.ARTICLE_ERRORS.inc(stage=timings["failed_stage"])
+
+
+def extract_article_timed(url, html):
+    """Igual a extract_article, mas devolve também os tempos de cada etapa
+    
+    Fica no nível do módulo para poder ser executada em um processo separado; como
+    as métricas desse processo não chegam ao principal, os tempos voltam junto com o artigo.
+    """
+    # newspaper e NLTK só são carregados quando o primeiro artigo é extraído
+    from newspaper import Article
+    
+    timings = {}
+    stage = "parse"
+    try:
+        article = Article(url)
+        article.download(input_html=html)
+        start = time.perf_counter()
+        article.parse()
+        timings["parse"] = time.perf_counter() - start
+        
+        # Extrair data de publicação, usar data atual se não disponível
+        if article.publish_date:
+            pub_date = article.publish_date
+        else:
+            pub_date = datetime.now()
+        
+        # Analisar sentimento do texto (simplificado); a mesma análise é
+        # reaproveitada depois pelo detector de fake news
+        analysis = None
+        if article.text:
+            analysis = analyze_article(article.title, article.text)
+            sentiment = analysis.sentiment
+        else:
+            sentiment = 0
+        
+        # Extrair imagem principal, se disponível
+        image_url = article.top_image if article.top_image else ""
+        
+        # Criar resumo se o artigo tiver conteúdo
+        summary = ""
+        if article.text:
+            stage = "nlp"
+            ensure_nltk_resources('tokenizers/punkt')
+            start = time.perf_counter()
+            article.nlp()
+            timings["nlp"] = time.perf_counter() - start
+            summary = article.summary
+        
+        data = {
+            "title": article.title,
+            "url": url,
+            "content": article.text,
+            "summary": summary,
+            "image_url": image_url,
+            "published_date": pub_date.isoformat(),
+            "source": article.source_url if article.source_url else url.split('/')[2],
+            "sentiment": sentiment,
+            "categories": article.meta_keywords if article.meta_keywords else [],
+            "processed_at": datetime.now().isoformat()
+        }
+        
+        return data, analysis, timings
+        
+    except Exception as e:
+        logger.error(f"Erro ao processar artigo de {url}: {e}")
+        timings["failed_stage"] = stage
+        return None, None, timings
+
+
+class HostThrottle:
+    """Limita as requisições simultâneas e o intervalo entre requisições para um mesmo site"""
+    
+    def __init__(self, max_per_host=2, min_interval=1.0):
+        self.max_per_host = max(1, max_per_host)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._semaphores = {}
+        self._next_slot = {}
+    
+    @contextmanager
+    def slot(self, url):
+        """Reserva uma vaga para acessar o site da URL, aguardando se necessário"""
+        host = urlparse(url).netloc
+        
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+        
+        with semaphore:
+            # Reservar o próximo horário livre para este site
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_slot.get(host, now))
+                self._next_slot[host] = start_at + self.min_interval
+            
+            wait = start_at - now
+            if wait > 0:
+                time.sleep(wait)
+            
+            yield
 
 
 class NewsFetcher:
-    def __init__(self):
-        self.cache_file = os.path.join(config.CACHE_DIR, "news_cache.json")
+    def __init__(self, max_workers=None, extraction_mode=None, extraction_workers=None):
         self.user_prefs_file = os.path.join(config.DATA_DIR, "user_preferences.json")
-        self.cache = self._load_cache()
+        self.article_store = ArticleStore(os.path.join(config.CACHE_DIR, "articles.db"))
+        self.seen_urls = UrlDedupeSet(os.path.join(config.CACHE_DIR, "seen_urls.bin"))
         self.user_preferences = self._load_user_preferences()
+        self.feed_validators_file = os.path.join(config.CACHE_DIR, "feed_validators.json")
+        self.feed_validators = self._load_feed_validators()
+        self._feed_validators_changed = False
+        self.article_pool_file = os.path.join(config.CACHE_DIR, "article_pool.json")
+        self.max_workers = max(1, max_workers or config.FETCH_WORKERS)
+        self.throttle = HostThrottle(config.FETCH_MAX_PER_HOST, config.FETCH_HOST_DELAY)
+        self.extraction_mode = extraction_mode or config.EXTRACTION_MODE
+        self.extraction_workers = max(1, extraction_workers or config.EXTRACTION_WORKERS)
+        self._process_pool = None
+        self._process_pool_lock = threading.Lock()
+        self._validators_lock = threading.Lock()
+        self._last_prune = None
+        self._prune_lock = threading.Lock()
+        self._article_pool_lock = threading.Lock()
         
-    def _load_cache(self):
-        """Carrega o cache de notícias já processadas"""
-        if os.path.exists(self.cache_file):
+    def _load_feed_validators(self):
+        """Carrega os validadores HTTP (ETag / Last-Modified) de cada feed"""
+        if os.path.exists(self.feed_validators_file):
             try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                with open(self.feed_validators_file, 'r', encoding='utf-8') as f:
                     return json.load(f)
             except Exception as e:
-                logger.error(f"Erro ao carregar cache: {e}")
-                return {"last_update": "", "processed_urls": []}
-        return {"last_update": "", "processed_urls": []}
+                logger.error(f"Erro ao carregar validadores dos feeds: {e}")
+                return {}
+        return {}
     
-    def _save_cache(self):
-        """Salva o cache de notícias processadas"""
-        try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Erro ao salvar cache: {e}")
+    def save_feed_validators(self):
+        """Salva os validadores dos feeds, se houve alteração"""
+        with self._validators_lock:
+            if not self._feed_validators_changed:
+                return
+            try:
+                with open(self.feed_validators_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.feed_validators, f, ensure_ascii=False, indent=2)
+                self._feed_validators_changed = False
+            except Exception as e:
+                logger.error(f"Erro ao salvar validadores dos feeds: {e}")
     
     def _load_user_preferences(self):
         """Carrega as preferências do usuário"""
@@ -72,114 +211,375 @@ class NewsFetcher:
             logger.warning(f"Categoria não encontrada: {category}")
             return []
         
-        all_news = []
-        sources = config.NEWS_SOURCES[category]
+        return self._fetch_categories([category], limit)[category]
+    
+    def _fetch_categories(self, categories, limit):
+        """Baixa feeds e artigos de várias categorias em paralelo
         
-        for source_url in sources:
-            try:
-                logger.info(f"Buscando notícias de: {source_url}")
-                feed = feedparser.parse(source_url)
-                
-                for entry in feed.entries[:limit]:
-                    if entry.link in self.cache["processed_urls"]:
-                        continue
-                    
-                    try:
-                        article_data = self._process_article(entry.link)
-                        if article_data and verify_news(article_data["title"], article_data["content"]):
-                            all_news.append(article_data)
-                    except Exception as e:
-                        logger.error(f"Erro ao processar artigo {entry.link}: {e}")
-                
-                # Aguardar um pouco para não sobrecarregar o servidor
-                time.sleep(1)
+        Retorna um dicionário {categoria: [notícias]} com as notícias na mesma
+        ordem em que aparecem nos feeds de config.NEWS_SOURCES.
+        """
+        results = {category: [] for category in categories}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fetch") as executor:
+            # 1. Baixar todos os feeds ao mesmo tempo
+            feed_futures = []
+            for category in categories:
+                for source_url in config.NEWS_SOURCES[category]:
+                    future = executor.submit(self._fetch_feed_links, source_url, limit, category)
+                    feed_futures.append((category, source_url, future))
+            
+            feed_links = []
+            for category, source_url, future in feed_futures:
+                try:
+                    feed_links.append((category, future.result()))
+                except Exception as e:
+                    logger.error(f"Erro ao buscar notícias de {source_url}: {e}")
             
+            # 2. Reaproveitar artigos vistos recentemente e baixar, extrair e verificar apenas os novos
+            stored_articles = self.article_store.get_many(
+                link for _, links in feed_links for link in links if link in self.seen_urls
+            )
+            # URLs vistas recentemente que falharam na extração não são tentadas de novo
+            new_links = list(dict.fromkeys(
+                link for _, links in feed_links for link in links if link not in self.seen_urls
+            ))
+            new_articles = self._ingest_links(new_links, executor)
+        
+        # 3. Montar o resultado mantendo a ordem dos feeds; um artigo que aparece em
+        # feeds de categorias diferentes entra em todas elas (baixado uma única vez)
+        collected_urls = {category: set() for category in categories}
+        for category, links in feed_links:
+            for link in links:
+                if link in collected_urls[category]:
+                    continue
+                collected_urls[category].add(link)
+                
+                article_data = stored_articles.get(link) or new_articles.get(link)
+                if article_data and article_data["reliable"]:
+                    results[category].append(article_data)
+        
+        self.save_feed_validators()
+        return results
+    
+    def ingest_articles(self, links):
+        """Baixa, extrai, verifica e grava os artigos ainda não vistos; retorna {url: artigo}"""
+        new_links = list(dict.fromkeys(link for link in links if link not in self.seen_urls))
+        if not new_links:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest") as executor:
+            return self._ingest_links(new_links, executor)
+    
+    def _ingest_links(self, links, executor):
+        """Processa os links no executor, verifica os artigos em um único lote e grava tudo"""
+        futures = [(link, executor.submit(self._process_article, link)) for link in links]
+        
+        new_articles = {}
+        for link, future in futures:
+            try:
+                article_data = future.result()
             except Exception as e:
-                logger.error(f"Erro ao buscar notícias de {source_url}: {e}")
+                # Falha no download (ex.: tempo esgotado) ou no pool de processos: não marcar como visto
+                logger.error(f"Erro ao baixar ou processar artigo {link}: {e}")
+                continue
+            
+            # Artigo extraído ou com falha definitiva na extração: não baixar de novo dentro da janela
+            self.seen_urls.add(link)
+            
+            if article_data:
+                new_articles[link] = article_data
+        
+        # Verificar todos os artigos novos em um único lote
+        if new_articles:
+            verdicts = verify_news_batch(
+                [article["title"] for article in new_articles.values()],
+                [article["content"] for article in new_articles.values()]
+            )
+            for article, reliable in zip(new_articles.values(), verdicts):
+                article["reliable"] = reliable
+            
+            # Montar agora o índice de palavras usado no filtro de tópicos excluídos
+            for link, article in new_articles.items():
+                topic_index(link, article["title"], article["content"])
+        
+        # Gravar os artigos novos (confiáveis ou não) em uma única transação
+        self.article_store.save_many(list(new_articles.values()))
+        self.prune_articles()
+        self.seen_urls.save()
+        return new_articles
+    
+    def prune_articles(self, force=False):
+        """Remove de articles.db os artigos mais antigos que ARTICLE_RETENTION_HOURS
+        
+        Roda no máximo uma vez a cada ARTICLE_PRUNE_INTERVAL_MINUTES (ou sempre, com `force`).
+        """
+        with self._prune_lock:
+            now = datetime.now()
+            interval = timedelta(minutes=config.ARTICLE_PRUNE_INTERVAL_MINUTES)
+            if not force and self._last_prune is not None and now - self._last_prune < interval:
+                return 0
+            self._last_prune = now
         
-        return all_news
+        # Um artigo ainda marcado como visto não é baixado de novo, então precisa
+        # continuar guardado pelo menos enquanto a URL estiver na janela de dedupe
+        retention_hours = max(config.ARTICLE_RETENTION_HOURS, config.URL_DEDUPE_WINDOW_HOURS)
+        try:
+            removed = self.article_store.prune(now - timedelta(hours=retention_hours))
+        except Exception as e:
+            logger.error(f"Erro ao remover artigos antigos: {e}")
+            return 0
+        
+        if removed:
+            logger.info(f"{removed} artigos com mais de {retention_hours}h removidos do armazenamento")
+        return removed
+    
+    def _fetch_feed_links(self, source_url, limit, category=None):
+        """Baixa um feed RSS e retorna os links das entradas mais recentes"""
+        with profiling.span("feed", source_url, category=category):
+            links, _, _ = self.fetch_feed_entries(source_url)
+        return links[:limit]
+    
+    def fetch_feed_entries(self, source_url):
+        """Baixa um feed RSS e retorna (links, datas de publicação, feed alterado?)
+        
+        As datas são timestamps (ou None quando a entrada não informa a data).
+        Usa GET condicional: se o servidor responder 304 (feed sem alterações),
+        o feed não é interpretado e os links da última leitura são reaproveitados.
+        """
+        logger.info(f"Buscando notícias de: {source_url}")
+        with self._validators_lock:
+            validators = dict(self.feed_validators.get(source_url, {}))
+        
+        with self.throttle.slot(source_url):
+            start = time.perf_counter()
+            feed = feedparser.parse(
+                source_url,
+                etag=validators.get("etag"),
+                modified=validators.get("modified")
+            )
+            metrics.FEED_FETCH_SECONDS.observe(time.perf_counter() - start, status=feed.get("status", "error"))
+        
+        if feed.get("status") == 304:
+            logger.info(f"Feed sem alterações desde a última leitura: {source_url}")
+            return validators.get("links", []), [], False
+        
+        entries = [entry for entry in feed.entries if entry.get("link")]
+        links = [entry.link for entry in entries]
+        published = []
+        for entry in entries:
+            parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+            published.append(calendar.timegm(parsed) if parsed else None)
+        
+        # Guardar os validadores para a próxima leitura
+        if feed.get("etag") or feed.get("modified"):
+            with self._validators_lock:
+                self.feed_validators[source_url] = {
+                    "etag": feed.get("etag"),
+                    "modified": feed.get("modified"),
+                    "links": links
+                }
+                self._feed_validators_changed = True
+        
+        return links, published, True
     
     def _process_article(self, url):
         """Processa um artigo de notícia, extraindo seu conteúdo"""
+        with profiling.span("article", url):
+            return self._download_and_extract(url)
+    
+    def _download_and_extract(self, url):
+        """Baixa o artigo e extrai o conteúdo (na thread ou no pool de processos)
+        
+        Retorna None se a extração falhar; erros no download são repassados, para
+        que o artigo seja tentado de novo na próxima busca.
+        """
+        from newspaper import Article
+        
         try:
             article = Article(url)
-            article.download()
-            article.parse()
+            with self.throttle.slot(url), metrics.ARTICLE_STAGE_SECONDS.time(stage="download"):
+                article.download()
+        except Exception:
+            metrics.ARTICLE_ERRORS.inc(stage="download")
+            raise
+        
+        if self.extraction_mode != "process":
+            data, _ = extract_article(url, article.html)
+            return data
+        
+        # Modo processo: o HTML baixado é enviado para um processo separado
+        data, analysis, timings = self._get_process_pool().submit(extract_article_timed, url, article.html).result()
+        record_extraction_timings(timings)
+        if data and analysis:
+            # Guardar a análise feita no outro processo para o detector reaproveitar
+            store_analysis(data["title"], data["content"], analysis)
+        return data
+    
+    def _get_process_pool(self):
+        """Cria (uma vez) o pool de processos usado na extração dos artigos"""
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                # O pool é criado a partir de uma thread de busca: "fork" copiaria locks
+                # possivelmente ocupados por outras threads, então os processos são iniciados com "spawn"
+                self._process_pool = ProcessPoolExecutor(max_workers=self.extraction_workers,
+                                                         mp_context=multiprocessing.get_context("spawn"))
+                atexit.register(self.close)
+                logger.info(f"Extração de artigos em {self.extraction_workers} processos")
+            return self._process_pool
+    
+    def close(self):
+        """Encerra o pool de processos de extração, se estiver em uso"""
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown()
+                self._process_pool = None
+    
+    def build_article_pool(self, categories=None, limit=10):
+        """Busca, extrai e verifica as notícias de cada categoria uma única vez por execução"""
+        if categories is None:
+            categories = list(config.NEWS_SOURCES.keys())
+        
+        valid_categories = []
+        for category in categories:
+            if category not in config.NEWS_SOURCES:
+                logger.warning(f"Categoria não encontrada: {category}")
+            elif category not in valid_categories:
+                valid_categories.append(category)
+        
+        # Todas as categorias são baixadas em paralelo
+        article_pool = self._fetch_categories(valid_categories, limit)
+        
+        total = sum(len(news) for news in article_pool.values())
+        logger.info(f"Conjunto de notícias montado: {total} notícias em {len(article_pool)} categorias")
+        return article_pool
+    
+    def _read_article_pool_file(self):
+        """Entradas gravadas por categoria: {categoria: {"built_at": ..., "articles": [...]}}"""
+        if not os.path.exists(self.article_pool_file):
+            return {}
+        
+        with open(self.article_pool_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # Formato antigo: um único built_at para todas as categorias
+        if "built_at" in data:
+            return {category: {"built_at": data["built_at"], "articles": articles}
+                    for category, articles in data["categories"].items()}
+        return data["categories"]
+    
+    def save_article_pool(self, article_pool):
+        """Grava as categorias recém-montadas no conjunto de notícias (gravação atômica)
+        
+        As demais categorias já gravadas são mantidas com a data em que foram montadas,
+        para que a idade de cada uma seja conferida separadamente no carregamento.
+        """
+        with self._article_pool_lock:
+            try:
+                entries = self._read_article_pool_file()
+            except Exception as e:
+                logger.error(f"Erro ao ler conjunto de notícias gravado: {e}")
+                entries = {}
             
-            # Extrair data de publicação, usar data atual se não disponível
-            if article.publish_date:
-                pub_date = article.publish_date
-            else:
-                pub_date = datetime.now()
+            built_at = datetime.now().isoformat()
+            for category, articles in article_pool.items():
+                entries[category] = {"built_at": built_at, "articles": articles}
             
-            # Analisar sentimento do texto (simplificado)
-            if article.text:
-                blob = TextBlob(article.text)
-                sentiment = blob.sentiment.polarity
-            else:
-                sentiment = 0
-            
-            # Extrair imagem principal, se disponível
-            image_url = article.top_image if article.top_image else ""
-            
-            # Criar resumo se o artigo tiver conteúdo
-            summary = ""
-            if article.text:
-                article.nlp()
-                summary = article.summary
-            
-            data = {
-                "title": article.title,
-                "url": url,
-                "content": article.text,
-                "summary": summary,
-                "image_url": image_url,
-                "published_date": pub_date.isoformat(),
-                "source": article.source_url if article.source_url else url.split('/')[2],
-                "sentiment": sentiment,
-                "categories": article.meta_keywords if article.meta_keywords else []
-            }
-            
-            # Adicionar à lista de URLs processados
-            self.cache["processed_urls"].append(url)
-            if len(self.cache["processed_urls"]) > 1000:  # Limitar tamanho do cache
-                self.cache["processed_urls"] = self.cache["processed_urls"][-1000:]
-            self.cache["last_update"] = datetime.now().isoformat()
-            self._save_cache()
+            self._write_article_pool_file({"categories": entries})
+    
+    def _write_article_pool_file(self, data):
+        """Substitui o arquivo do conjunto de notícias (arquivo temporário + os.replace)"""
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=".article_pool-", suffix=".json", dir=config.CACHE_DIR)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(temp_path, self.article_pool_file)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        except Exception as e:
+            logger.error(f"Erro ao salvar conjunto de notícias: {e}")
+    
+    def load_article_pool(self, max_age_minutes=None):
+        """Carrega o conjunto de notícias gravado; retorna None se não existir
+        
+        Categorias montadas há mais de `max_age_minutes` são deixadas de fora.
+        """
+        if not os.path.exists(self.article_pool_file):
+            return None
+        
+        try:
+            with self._article_pool_lock:
+                entries = self._read_article_pool_file()
             
-            return data
+            article_pool = {}
+            for category, entry in entries.items():
+                built_at = datetime.fromisoformat(entry["built_at"])
+                if max_age_minutes is not None and datetime.now() - built_at > timedelta(minutes=max_age_minutes):
+                    logger.info(f"Notícias de {category} gravadas estão desatualizadas (montadas em {entry['built_at']})")
+                    continue
+                article_pool[category] = entry["articles"]
             
+            return article_pool
         except Exception as e:
-            logger.error(f"Erro ao processar artigo de {url}: {e}")
+            logger.error(f"Erro ao carregar conjunto de notícias: {e}")
             return None
     
-    def get_news_for_user(self, user_id, count=5):
-        """Obtém notícias personalizadas para um usuário específico"""
-        # Verificar se o usuário tem preferências
-        user_prefs = self.user_preferences.get(str(user_id), {})
+    def get_news_for_user(self, user_id, count=5, article_pool=None):
+        """Obtém notícias personalizadas para um usuário específico
         
-        preferred_categories = user_prefs.get("categories", ["geral"])
-        excluded_topics = user_prefs.get("excluded_topics", [])
+        Se `article_pool` for informado (resultado de build_article_pool), as notícias
+        são selecionadas desse conjunto em memória, sem novas buscas nos feeds.
+        """
+        preferred_categories, excluded_topics = self._get_user_filters(user_id)
+        return self.select_news(preferred_categories, excluded_topics, count, article_pool)
+    
+    def _get_user_filters(self, user_id):
+        """Retorna as categorias preferidas e os tópicos excluídos do usuário"""
+        user_prefs = self.user_preferences.get(str(user_id), {})
+        return user_prefs.get("categories", ["geral"]), user_prefs.get("excluded_topics", [])
+    
+    def preference_signature(self, user_id, count):
+        """Assinatura das preferências que definem as notícias do usuário
         
+        Usuários com a mesma assinatura recebem exatamente as mesmas notícias, então
+        a seleção (e a mensagem formatada) pode ser feita uma vez por assinatura.
+        """
+        preferred_categories, excluded_topics = self._get_user_filters(user_id)
+        return (
+            tuple(preferred_categories),
+            tuple(sorted({" ".join(tokenize(topic)) for topic in excluded_topics} - {""})),
+            count
+        )
+    
+    def select_news(self, preferred_categories, excluded_topics, count=5, article_pool=None):
+        """Seleciona as notícias das categorias, sem os tópicos excluídos, mais recentes primeiro"""
         all_news = []
+        seen_urls = set()
         
         # Obter notícias das categorias preferidas
         for category in preferred_categories:
-            news = self.fetch_news_by_category(category, limit=10)
-            all_news.extend(news)
+            if article_pool is not None:
+                news = article_pool.get(category, [])
+            else:
+                news = self.fetch_news_by_category(category, limit=10)
+            
+            for news_item in news:
+                if news_item["url"] in seen_urls:
+                    continue
+                seen_urls.add(news_item["url"])
+                all_news.append(news_item)
         
-        # Filtrar tópicos excluídos
-        if excluded_topics:
+        # Filtrar tópicos excluídos (palavras ou frases inteiras, sem diferenciar acentos)
+        topics = [tokenize(topic) for topic in excluded_topics]
+        topics = [topic for topic in topics if topic]
+        if topics:
             filtered_news = []
             for news_item in all_news:
-                exclude = False
-                for topic in excluded_topics:
-                    if (topic.lower() in news_item["title"].lower() or 
-                        topic.lower() in news_item["content"].lower()):
-                        exclude = True
-                        break
-                
-                if not exclude:
+                index = topic_index(news_item["url"], news_item["title"], news_item["content"])
+                if not any(matches_topic(index, topic) for topic in topics):
                     filtered_news.append(news_item)
             
             all_news = filtered_news
@@ -217,6 +617,7 @@ class NewsFetcher:
         if not news_items:
             return "Não encontramos notícias que correspondam às suas preferências hoje. Tente novamente mais tarde."
         
+        start = time.perf_counter()
         intro = random.choice(config.INTRO_MESSAGES)
         formatted_text = f"*{intro}*\n\n"
         
@@ -235,6 +636,7 @@ class NewsFetcher:
         
         formatted_text += "💡 *Dica*: Sempre verifique a fonte das notícias que você recebe e desconfie de mensagens alarmistas ou sensacionalistas."
         
+        metrics.FORMAT_MESSAGE_SECONDS.observe(time.perf_counter() - start)
         return formatted_text
 
 
@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+import config
+
+try:
+    import resource  # Indisponível no Windows
+except ImportError:
+    resource = None
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("profiling")
+
+# Intervalo (s) entre as leituras da memória residente durante uma execução
+RSS_SAMPLE_SECONDS = 0.05
+
+# Trace da execução em andamento (None quando o --profile não está ativo)
+_current_trace = None
+_current_lock = threading.Lock()
+
+
+def _current_rss_mb():
+    """Memória residente atual do processo, em MB (None fora do Linux)"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def _max_rss_mb():
+    """Pico de memória residente do processo desde o início, em MB (None se não for possível medir)"""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # No macOS o valor vem em bytes; no Linux, em KB
+    return round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class RunTrace:
+    """Registro estruturado de uma execução: intervalos (spans) por etapa e pico de memória
+    
+    O pico de memória da rodada vem de leituras periódicas da memória residente
+    (/proc/self/statm) feitas por uma thread durante a execução; ru_maxrss é
+    registrado à parte, como o pico do processo desde que ele começou. Com
+    `trace_memory`, o tracemalloc também mede o pico de memória Python da rodada,
+    mas deixa as alocações mais lentas e distorce os tempos.
+    """
+    
+    def __init__(self, name, trace_memory=False):
+        self.name = name
+        self.started_at = datetime.now()
+        self.spans = []
+        self.result = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.trace_memory = trace_memory
+        self._rss_start = _current_rss_mb()
+        self._rss_peak = self._rss_start
+        self._sampling = threading.Event()
+        self._sampler = None
+        if self._rss_start is not None:
+            self._sampler = threading.Thread(target=self._sample_rss, name="profiling-rss", daemon=True)
+            self._sampler.start()
+        self._owns_tracemalloc = False
+        if trace_memory:
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+    
+    def _sample_rss(self):
+        """Acompanha o pico de memória residente até finish()"""
+        while not self._sampling.wait(RSS_SAMPLE_SECONDS):
+            rss = _current_rss_mb()
+            if rss is not None and rss > self._rss_peak:
+                self._rss_peak = rss
+    
+    @contextmanager
+    def span(self, kind, name, **attrs):
+        """Mede o bloco `with` como um intervalo do tipo `kind` (ex.: "feed", "article", "send")"""
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.add(kind, name, time.perf_counter() - start, start=start, error=error, **attrs)
+    
+    def add(self, kind, name, duration, start=None, **attrs):
+        """Registra um intervalo já medido"""
+        span = {
+            "kind": kind,
+            "name": str(name),
+            "start_s": round((start if start is not None else time.perf_counter() - duration) - self._start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "thread": threading.current_thread().name,
+        }
+        span.update({key: value for key, value in attrs.items() if value is not None})
+        with self._lock:
+            self.spans.append(span)
+    
+    def finish(self, top=None):
+        """Encerra o trace e monta o relatório"""
+        duration = time.perf_counter() - self._start
+        
+        memory = {"process_peak_rss_mb": _max_rss_mb()}
+        if self._sampler is not None:
+            self._sampling.set()
+            self._sampler.join()
+            rss_end = _current_rss_mb()
+            run_peak = max(self._rss_peak, rss_end or 0)
+            memory["run_start_rss_mb"] = round(self._rss_start, 1)
+            memory["run_peak_rss_mb"] = round(run_peak, 1)
+            memory["run_peak_increase_mb"] = round(run_peak - self._rss_start, 1)
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            memory["python_peak_mb"] = round(peak / (1024 * 1024), 1)
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+        
+        top = top or config.PROFILE_TOP_N
+        with self._lock:
+            spans = list(self.spans)
+        
+        by_kind = {}
+        for span in spans:
+            by_kind.setdefault(span["kind"], []).append(span)
+        
+        summary = {}
+        slowest = {}
+        for kind, kind_spans in by_kind.items():
+            durations = sorted(span["duration_ms"] for span in kind_spans)
+            summary[kind] = {
+                "count": len(durations),
+                "total_ms": round(sum(durations), 3),
+                "p50_ms": durations[len(durations) // 2],
+                "p90_ms": durations[min(len(durations) - 1, int(len(durations) * 0.9))],
+                "max_ms": durations[-1],
+            }
+            slowest[kind] = sorted(kind_spans, key=lambda span: span["duration_ms"], reverse=True)[:top]
+        
+        # Tempo somado dos feeds de cada categoria
+        categories = {}
+        for span in spans:
+            if "category" in span:
+                entry = categories.setdefault(span["category"], {"feeds": 0, "total_ms": 0.0})
+                entry["feeds"] += 1
+                entry["total_ms"] = round(entry["total_ms"] + span["duration_ms"], 3)
+        
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_s": round(duration, 3),
+            "memory": memory,
+            "result": self.result,
+            "summary": summary,
+            "categories": categories,
+            "slowest": slowest,
+            "spans": spans,
+        }
+
+
+def span(kind, name, **attrs):
+    """Intervalo no trace em andamento; sem trace ativo, não faz nada"""
+    trace = _current_trace
+    if trace is None:
+        return nullcontext()
+    return trace.span(kind, name, **attrs)
+
+
+def save_report(report, directory=None):
+    """Grava o relatório em JSON e retorna o caminho do arquivo"""
+    directory = directory or config.PROFILES_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{report['run']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def profiled(name, func, *args, trace_memory=False, **kwargs):
+    """Executa `func` registrando um RunTrace e grava o relatório em config.PROFILES_DIR"""
+    global _current_trace
+    
+    with _current_lock:
+        trace = RunTrace(name, trace_memory=trace_memory)
+        _current_trace = trace
+        try:
+            result = func(*args, **kwargs)
+            if hasattr(result, "as_dict"):
+                trace.result = result.as_dict()
+            return result
+        finally:
+            _current_trace = None
+            report = trace.finish()
+            try:
+                path = save_report(report)
+                logger.info(f"Relatório de execução de {name} salvo em {path} ({report['duration_s']}s, "
+                            f"pico de memória da rodada {report['memory'].get('run_peak_rss_mb')} MB)")
+            except Exception as e:
+                logger.error(f"Erro ao salvar relatório de execução: {e}")
@@ -5,33 +5,32 @@ import os
 import argparse
 import sys
 import subprocess
+import importlib.util
 
 """
 Script de inicialização do InfoIdosos
 """
 
+# Módulos que precisam estar instalados (nome usado no import)
+REQUIRED_MODULES = [
+    'dotenv', 'pywhatkit', 'requests', 'bs4', 'newspaper', 'nltk',
+    'feedparser', 'flask', 'textblob', 'sklearn', 'numpy',
+]
+
 def check_dependencies():
-    """Verifica se todas as dependências estão instaladas"""
-    try:
-        import dotenv
-        import pywhatkit
-        import requests
-        import bs4
-        import newspaper
-        import pandas
-        import nltk
-        import feedparser
-        import schedule
-        import flask
-        import textblob
-        import matplotlib
-        import sklearn
-        print("✅ Todas as dependências estão instaladas.")
-        return True
-    except ImportError as e:
-        print(f"❌ Dependência faltando: {e}")
+    """Verifica se todas as dependências estão instaladas
+    
+    Os módulos são apenas localizados (sem importar), já que o app.py
+    será executado em outro processo e importa o que precisar.
+    """
+    missing = [name for name in REQUIRED_MODULES if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"❌ Dependência faltando: {', '.join(missing)}")
         print("Por favor, execute 'pip install -r requirements.txt' para instalar todas as dependências.")
         return False
+    
+    print("✅ Todas as dependências estão instaladas.")
+    return True
 
 def create_directories():
     """Cria os diretórios necessários"""
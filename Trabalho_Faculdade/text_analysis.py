@@ -0,0 +1,179 @@
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict, namedtuple
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("text_analysis")
+
+# Resultado da análise de um artigo (título + conteúdo)
+TextAnalysis = namedtuple("TextAnalysis", [
+    "lowered",            # título e conteúdo unidos por um espaço, em minúsculas
+    "word_count",         # quantidade de palavras
+    "exclamation_count",  # quantidade de pontos de exclamação
+    "all_caps_count",     # palavras com mais de 3 letras escritas EM MAIÚSCULAS
+    "sentiment",          # polaridade do sentimento (TextBlob), de -1 a 1
+])
+
+
+class LRUCache:
+    """Cache simples com limite de tamanho, descartando o item usado há mais tempo"""
+    
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+    
+    def get(self, key):
+        """Retorna o valor guardado para a chave (ou None), marcando-o como usado"""
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+    
+    def put(self, key, value):
+        """Guarda o valor, descartando o item mais antigo se o cache estiver cheio"""
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# Índice de palavras de um artigo, usado para filtrar tópicos excluídos
+TopicIndex = namedtuple("TopicIndex", [
+    "tokens",       # conjunto das palavras normalizadas do título e do conteúdo
+    "padded_text",  # as palavras normalizadas unidas por espaço, com espaço nas pontas
+])
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+_analysis_cache = LRUCache(config.TEXT_ANALYSIS_CACHE_SIZE)
+_topic_index_cache = LRUCache(config.TEXT_ANALYSIS_CACHE_SIZE)
+
+
+def content_hash(title, content):
+    """Chave do cache: hash do título e do conteúdo do artigo"""
+    return hashlib.sha1(f"{title}\0{content}".encode("utf-8")).hexdigest()
+
+
+def analyze_article(title, content):
+    """Analisa o artigo uma única vez e reaproveita o resultado nas chamadas seguintes"""
+    title = title or ""
+    content = content or ""
+    key = content_hash(title, content)
+    
+    analysis = _analysis_cache.get(key)
+    if analysis is None:
+        analysis = _analyze(title + " " + content)
+        _analysis_cache.put(key, analysis)
+    
+    return analysis
+
+
+def clear_cache():
+    """Descarta todas as análises em cache"""
+    _analysis_cache.clear()
+    _topic_index_cache.clear()
+
+
+def normalize_text(text):
+    """Converte para minúsculas e remove os acentos ("Saúde" -> "saude")"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """Palavras normalizadas do texto, na ordem em que aparecem"""
+    return TOKEN_PATTERN.findall(normalize_text(text))
+
+
+def topic_index(url, title, content):
+    """Índice de palavras do artigo, calculado uma vez por URL e reaproveitado (com cache)
+    
+    O índice é montado na ingestão do artigo; depois, cada consulta é só uma busca
+    pela URL, sem percorrer o texto de novo.
+    """
+    index = _topic_index_cache.get(url)
+    if index is None:
+        tokens = tokenize((title or "") + " " + (content or ""))
+        index = TopicIndex(frozenset(tokens), " " + " ".join(tokens) + " ")
+        _topic_index_cache.put(url, index)
+    
+    return index
+
+
+def matches_topic(index, topic_tokens):
+    """Verifica se o tópico (já passado por tokenize) aparece no artigo como palavra ou frase inteira"""
+    if not topic_tokens:
+        return False
+    
+    # Todas as palavras precisam estar no artigo; só então a frase é conferida
+    if not all(token in index.tokens for token in topic_tokens):
+        return False
+    
+    if len(topic_tokens) == 1:
+        return True
+    
+    return " " + " ".join(topic_tokens) + " " in index.padded_text
+
+
+def store_analysis(title, content, analysis):
+    """Guarda no cache uma análise feita em outro processo"""
+    _analysis_cache.put(content_hash(title or "", content or ""), analysis)
+
+
+# Recursos do NLTK já verificados neste processo
+_nltk_checked = set()
+_nltk_lock = threading.Lock()
+
+
+def ensure_nltk_resources(*resources):
+    """Garante que os recursos do NLTK (ex.: "tokenizers/punkt") estejam instalados
+    
+    O NLTK só é importado aqui, na primeira vez que algum recurso é necessário,
+    e cada recurso é verificado uma única vez por processo.
+    """
+    with _nltk_lock:
+        missing = [resource for resource in resources if resource not in _nltk_checked]
+        if not missing:
+            return
+        
+        import nltk
+        for resource in missing:
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                logger.info(f"Baixando recurso do NLTK: {resource}")
+                nltk.download(resource.split("/")[-1])
+            _nltk_checked.add(resource)
+
+
+def _analyze(text):
+    """Faz a tokenização e a análise de sentimento do texto"""
+    from textblob import TextBlob
+    
+    words = text.split()
+    return TextAnalysis(
+        lowered=text.lower(),
+        word_count=len(words),
+        exclamation_count=text.count("!"),
+        all_caps_count=sum(1 for word in words if word.isupper() and len(word) > 3),
+        sentiment=TextBlob(text).sentiment.polarity,
+    )
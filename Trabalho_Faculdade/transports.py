@@ -0,0 +1,166 @@
+import time
+import random
+import logging
+import threading
+from datetime import datetime
+import requests
+from requests.adapters import HTTPAdapter
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("transports")
+
+
+class Transport:
+    """Meio de envio de mensagens de WhatsApp
+    
+    `send` recebe o número já formatado (apenas dígitos, com código do país)
+    e retorna True se a mensagem foi enviada.
+    """
+    
+    name = "base"
+    
+    def send(self, phone, message):
+        raise NotImplementedError
+    
+    def close(self):
+        """Libera os recursos do transporte (conexões, navegador etc.)"""
+        pass
+
+
+class TwilioHttpTransport(Transport):
+    """Envio pela API REST do Twilio, reaproveitando conexões HTTP (keep-alive)"""
+    
+    name = "twilio"
+    API_URL = "https://api.twilio.com/2010-04-01/Accounts/{account_sid}/Messages.json"
+    
+    def __init__(self, account_sid, auth_token, from_number, pool_size=None, timeout=15):
+        self.url = self.API_URL.format(account_sid=account_sid)
+        self.from_number = from_number
+        self.timeout = timeout
+        
+        # Uma sessão com um pool de conexões do tamanho do número de envios simultâneos
+        self.session = requests.Session()
+        self.session.auth = (account_sid, auth_token)
+        pool_size = pool_size or config.DELIVERY_WORKERS
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+    
+    def send(self, phone, message):
+        try:
+            response = self.session.post(self.url, timeout=self.timeout, data={
+                "From": f"whatsapp:{self.from_number}",
+                "To": f"whatsapp:+{phone}",
+                "Body": message
+            })
+            
+            if response.status_code >= 400:
+                logger.error(f"Erro ao enviar mensagem via Twilio (HTTP {response.status_code}): {response.text[:200]}")
+                return False
+            
+            logger.info(f"Mensagem enviada com sucesso via Twilio para: {phone} (SID: {response.json().get('sid')})")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao enviar mensagem via Twilio: {e}")
+            return False
+    
+    def close(self):
+        self.session.close()
+
+
+class PyWhatKitTransport(Transport):
+    """Envio pelo WhatsApp Web, automatizando o navegador com pywhatkit (método alternativo)"""
+    
+    name = "pywhatkit"
+    
+    def send(self, phone, message):
+        try:
+            import pywhatkit
+            
+            # Obter hora e minuto atual (para envio imediato)
+            now = datetime.now()
+            current_hour = now.hour
+            current_minute = now.minute + 1  # Adicionar 1 minuto para garantir tempo suficiente
+            
+            # Ajustar para o próximo dia se necessário
+            if current_minute >= 60:
+                current_minute = 0
+                current_hour += 1
+            
+            if current_hour >= 24:
+                current_hour = 0
+            
+            # Enviar a mensagem
+            pywhatkit.sendwhatmsg(
+                phone_no=f"+{phone}", 
+                message=message,
+                time_hour=current_hour,
+                time_min=current_minute,
+                wait_time=20,  # Tempo de espera para enviar após abrir o WhatsApp Web
+                tab_close=True  # Fechar a aba após o envio
+            )
+            
+            # Aguardar um pouco para garantir que a mensagem seja enviada
+            time.sleep(5)
+            
+            logger.info(f"Mensagem enviada com sucesso via pywhatkit para: {phone}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erro ao enviar mensagem via pywhatkit: {e}")
+            return False
+
+
+class MockTransport(Transport):
+    """Transporte local para testes de carga: simula latência e taxa de erros, sem enviar nada"""
+    
+    name = "mock"
+    
+    def __init__(self, latency_ms=None, jitter_ms=None, error_rate=None, seed=None):
+        self.latency = (latency_ms if latency_ms is not None else config.MOCK_TRANSPORT_LATENCY_MS) / 1000.0
+        self.jitter = (jitter_ms if jitter_ms is not None else config.MOCK_TRANSPORT_JITTER_MS) / 1000.0
+        self.error_rate = error_rate if error_rate is not None else config.MOCK_TRANSPORT_ERROR_RATE
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.failed = 0
+    
+    def send(self, phone, message):
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            fail = self._random.random() < self.error_rate
+        
+        if delay > 0:
+            time.sleep(delay)
+        
+        with self._lock:
+            if fail:
+                self.failed += 1
+            else:
+                self.sent += 1
+        return not fail
+
+
+def create_transport(name):
+    """Cria o transporte configurado pelo nome ("twilio", "pywhatkit" ou "mock")"""
+    if not name:
+        return None
+    
+    if name == "twilio":
+        if not (config.TWILIO_ACCOUNT_SID and config.TWILIO_AUTH_TOKEN):
+            logger.warning("Twilio não configurado. Verifique suas credenciais.")
+            return None
+        return TwilioHttpTransport(config.TWILIO_ACCOUNT_SID, config.TWILIO_AUTH_TOKEN, config.TWILIO_PHONE_NUMBER)
+    
+    if name == "pywhatkit":
+        return PyWhatKitTransport()
+    
+    if name == "mock":
+        return MockTransport()
+    
+    logger.error(f"Transporte desconhecido: {name}")
+    return None
@@ -0,0 +1,138 @@
+import os
+import time
+import tempfile
+import struct
+import hashlib
+import logging
+import threading
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("url_dedupe")
+
+# Formato do arquivo: cabeçalho (assinatura, versão, quantidade) seguido de
+# registros com o hash de 64 bits da URL e o horário (epoch) em que foi vista
+FILE_MAGIC = b"IIDS"
+FILE_VERSION = 1
+HEADER = struct.Struct("<4sHI")
+RECORD = struct.Struct("<QI")
+
+
+def hash_url(url):
+    """Calcula um hash de 64 bits estável para a URL"""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class UrlDedupeSet:
+    """Conjunto de URLs vistas recentemente, com expiração por idade
+    
+    Guarda apenas o hash de cada URL e o horário em que ela foi vista, de modo
+    que a consulta é O(1) e URLs mais antigas que a janela são descartadas.
+    """
+    
+    def __init__(self, path=None, window_hours=None):
+        self.path = path or os.path.join(config.CACHE_DIR, "seen_urls.bin")
+        hours = window_hours if window_hours is not None else config.URL_DEDUPE_WINDOW_HOURS
+        self.window_seconds = int(hours * 3600)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._seen = {}
+        # Contador de alterações e valor dele na última gravação bem-sucedida
+        self._version = 0
+        self._saved_version = 0
+        self.load()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._seen)
+    
+    def __contains__(self, url):
+        key = hash_url(url)
+        with self._lock:
+            seen_at = self._seen.get(key)
+        return seen_at is not None and seen_at >= time.time() - self.window_seconds
+    
+    def add(self, url, seen_at=None):
+        """Registra a URL como vista no horário informado (padrão: agora)"""
+        seen_at = int(seen_at if seen_at is not None else time.time())
+        with self._lock:
+            self._seen[hash_url(url)] = seen_at
+            self._version += 1
+    
+    def evict_expired(self, now=None):
+        """Remove as URLs vistas antes do início da janela; retorna quantas foram removidas"""
+        cutoff = (now if now is not None else time.time()) - self.window_seconds
+        with self._lock:
+            expired = [key for key, seen_at in self._seen.items() if seen_at < cutoff]
+            for key in expired:
+                del self._seen[key]
+            if expired:
+                self._version += 1
+        return len(expired)
+    
+    def load(self):
+        """Carrega o conjunto salvo em disco, descartando entradas expiradas"""
+        if not os.path.exists(self.path):
+            return
+        
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            
+            magic, version, count = HEADER.unpack_from(data, 0)
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                logger.warning(f"Arquivo de URLs vistas em formato desconhecido: {self.path}")
+                return
+            
+            seen = {}
+            for key, seen_at in RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size]):
+                seen[key] = seen_at
+            
+            with self._lock:
+                self._seen = seen
+                self._saved_version = self._version
+            self.evict_expired()
+        except Exception as e:
+            logger.error(f"Erro ao carregar URLs vistas: {e}")
+    
+    def save(self):
+        """Salva o conjunto em disco (formato binário compacto), se houve alteração
+        
+        Gravações simultâneas (leitura contínua dos feeds e busca do envio) são
+        feitas uma de cada vez, e as alterações só contam como salvas depois que
+        o arquivo foi substituído com sucesso.
+        """
+        self.evict_expired()
+        
+        with self._save_lock:
+            with self._lock:
+                if self._version == self._saved_version:
+                    return
+                records = list(self._seen.items())
+                version = self._version
+            
+            directory = os.path.dirname(os.path.abspath(self.path))
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=".seen_urls-", suffix=".bin", dir=directory)
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(records)))
+                        f.write(b"".join(RECORD.pack(key, seen_at) for key, seen_at in records))
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.path)
+                except Exception:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+            except Exception as e:
+                logger.error(f"Erro ao salvar URLs vistas: {e}")
+                return
+            
+            with self._lock:
+                self._saved_version = version
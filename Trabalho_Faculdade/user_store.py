@@ -0,0 +1,93 @@
+import os
+import json
+import atexit
+import logging
+import time
+import tempfile
+import threading
+from datetime import datetime
+import config
+
+# Configurar logging
+logging.basicConfig(
+    level=getattr(logging, config.LOG_LEVEL),
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("user_store")
+
+
+class UserStore:
+    """Usuários cadastrados (users.json), com gravação atômica
+    
+    As estatísticas de envio são atualizadas em memória e gravadas no máximo uma
+    vez a cada `flush_interval` segundos (e ao final de cada rodada), em vez de
+    regravar o arquivo inteiro a cada mensagem enviada. Assim o número de gravações
+    depende da duração do envio, e não do número de usuários.
+    """
+    
+    def __init__(self, users_file=None, flush_interval=None):
+        self.users_file = users_file or os.path.join(config.DATA_DIR, "users.json")
+        self.flush_interval = config.USERS_FLUSH_INTERVAL_SECONDS if flush_interval is None else flush_interval
+        self._lock = threading.RLock()
+        self._pending_updates = 0
+        self._last_save = time.monotonic()
+        self.users = self._load()
+        atexit.register(self.flush)
+    
+    def _load(self):
+        """Carrega lista de usuários do arquivo"""
+        if os.path.exists(self.users_file):
+            try:
+                with open(self.users_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                logger.error(f"Erro ao carregar usuários: {e}")
+                return {}
+        return {}
+    
+    def save(self):
+        """Salva lista de usuários no arquivo
+        
+        O conteúdo é escrito em um arquivo temporário que depois substitui o
+        original, de modo que uma interrupção no meio da gravação não corrompe o arquivo.
+        """
+        with self._lock:
+            directory = os.path.dirname(os.path.abspath(self.users_file))
+            try:
+                fd, temp_path = tempfile.mkstemp(prefix=".users-", suffix=".json", dir=directory)
+                try:
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        json.dump(self.users, f, ensure_ascii=False, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(temp_path, self.users_file)
+                except Exception:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+                self._pending_updates = 0
+                self._last_save = time.monotonic()
+            except Exception as e:
+                logger.error(f"Erro ao salvar usuários: {e}")
+    
+    def flush(self):
+        """Grava as atualizações de estatísticas pendentes, se houver"""
+        with self._lock:
+            if self._pending_updates:
+                self.save()
+    
+    def record_delivery(self, user_id, news_count):
+        """Atualiza as estatísticas de um envio bem-sucedido, gravando no máximo uma vez por intervalo"""
+        with self._lock:
+            user_data = self.users.get(user_id)
+            if user_data is None:
+                return
+            
+            stats = user_data.setdefault("stats", {})
+            stats["messages_sent"] = stats.get("messages_sent", 0) + 1
+            stats["news_sent"] = stats.get("news_sent", 0) + news_count
+            stats["last_sent"] = datetime.now().isoformat()
+            
+            self._pending_updates += 1
+            if time.monotonic() - self._last_save >= self.flush_interval:
+                self.save()
@@ -1,10 +1,10 @@
-import time
 import logging
 import os
-import json
+import time
 from datetime import datetime
-import pywhatkit
-from twilio.rest import Client
+from message_log import MessageLog
+from transports import create_transport
+import metrics
 import config
 
 # Configurar logging
@@ -15,45 +15,29 @@ logging.basicConfig(
 logger = logging.getLogger("whatsapp_sender")
 
 class WhatsAppSender:
-    def __init__(self):
-        self.log_file = os.path.join(config.DATA_DIR, "message_logs.json")
-        self.message_logs = self._load_logs()
-        self.use_twilio = config.TWILIO_ACCOUNT_SID and config.TWILIO_AUTH_TOKEN
-        
-        if self.use_twilio:
-            try:
-                self.twilio_client = Client(config.TWILIO_ACCOUNT_SID, config.TWILIO_AUTH_TOKEN)
-                logger.info("Twilio inicializado com sucesso.")
-            except Exception as e:
-                logger.error(f"Erro ao inicializar Twilio: {e}")
-                self.use_twilio = False
-    
-    def _load_logs(self):
-        """Carrega o histórico de mensagens enviadas"""
-        if os.path.exists(self.log_file):
-            try:
-                with open(self.log_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Erro ao carregar logs de mensagens: {e}")
-                return {}
-        return {}
-    
-    def _save_logs(self):
-        """Salva o histórico de mensagens enviadas"""
-        try:
-            with open(self.log_file, 'w', encoding='utf-8') as f:
-                json.dump(self.message_logs, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            logger.error(f"Erro ao salvar logs de mensagens: {e}")
+    def __init__(self, transport=None, fallback_transport=None):
+        """Os transportes padrão vêm de config.WHATSAPP_TRANSPORT e config.WHATSAPP_FALLBACK_TRANSPORT
+        
+        Passe False em `transport` ou `fallback_transport` para não usar aquele transporte.
+        """
+        self.message_log = MessageLog(os.path.join(config.DATA_DIR, "message_logs.db"))
+        self.message_log.import_json(os.path.join(config.DATA_DIR, "message_logs.json"))
+        
+        if transport is None:
+            transport = create_transport(config.WHATSAPP_TRANSPORT)
+        if fallback_transport is None:
+            fallback_transport = create_transport(config.WHATSAPP_FALLBACK_TRANSPORT)
+        
+        self.transport = transport or None
+        self.fallback_transport = fallback_transport or None
+        
+        if self.transport:
+            logger.info(f"Transporte de mensagens: {self.transport.name}")
     
     def _log_message(self, recipient, message_type, content_summary, success=True, error=""):
         """Registra mensagem enviada no histórico"""
         timestamp = datetime.now().isoformat()
         
-        if recipient not in self.message_logs:
-            self.message_logs[recipient] = []
-        
         log_entry = {
             "timestamp": timestamp,
             "type": message_type,
@@ -62,8 +46,7 @@ class WhatsAppSender:
             "error": error
         }
         
-        self.message_logs[recipient].append(log_entry)
-        self._save_logs()
+        self.message_log.append(recipient, log_entry)
 
     def _format_phone_number(self, phone_number):
         """Formata o número de telefone para o formato correto do WhatsApp"""
@@ -76,98 +59,77 @@ class WhatsAppSender:
             
         return phone
     
-    def send_with_pywhatkit(self, phone_number, message):
-        """Envia mensagem usando pywhatkit (método alternativo)"""
-        try:
-            # Formatar o número de telefone
-            formatted_phone = self._format_phone_number(phone_number)
-            
-            # Obter hora e minuto atual (para envio imediato)
-            now = datetime.now()
-            current_hour = now.hour
-            current_minute = now.minute + 1  # Adicionar 1 minuto para garantir tempo suficiente
-            
-            # Ajustar para o próximo dia se necessário
-            if current_minute >= 60:
-                current_minute = 0
-                current_hour += 1
-            
-            if current_hour >= 24:
-                current_hour = 0
-            
-            # Enviar a mensagem
-            pywhatkit.sendwhatmsg(
-                phone_no=f"+{formatted_phone}", 
-                message=message,
-                time_hour=current_hour,
-                time_min=current_minute,
-                wait_time=20,  # Tempo de espera para enviar após abrir o WhatsApp Web
-                tab_close=True  # Fechar a aba após o envio
-            )
-            
-            # Aguardar um pouco para garantir que a mensagem seja enviada
-            time.sleep(5)
-            
-            logger.info(f"Mensagem enviada com sucesso via pywhatkit para: {phone_number}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Erro ao enviar mensagem via pywhatkit: {e}")
-            return False
-    
-    def send_with_twilio(self, phone_number, message):
-        """Envia mensagem usando Twilio WhatsApp API"""
-        if not self.use_twilio:
-            logger.error("Twilio não configurado. Verifique suas credenciais.")
+    def send_with(self, transport, phone_number, message):
+        """Envia a mensagem pelo transporte informado"""
+        if transport is None:
             return False
         
+        start = time.perf_counter()
+        success = False
         try:
-            # Formatar o número de telefone
-            formatted_phone = self._format_phone_number(phone_number)
-            
-            # Enviar mensagem via Twilio WhatsApp
-            message = self.twilio_client.messages.create(
-                from_=f'whatsapp:{config.TWILIO_PHONE_NUMBER}',
-                body=message,
-                to=f'whatsapp:+{formatted_phone}'
-            )
-            
-            logger.info(f"Mensagem enviada com sucesso via Twilio para: {phone_number} (SID: {message.sid})")
-            return True
-            
+            success = transport.send(self._format_phone_number(phone_number), message)
         except Exception as e:
-            logger.error(f"Erro ao enviar mensagem via Twilio: {e}")
-            return False
+            logger.error(f"Erro ao enviar mensagem via {transport.name}: {e}")
+        
+        metrics.SEND_SECONDS.observe(time.perf_counter() - start, transport=transport.name,
+                                     result="ok" if success else "error")
+        return success
     
     def send_message(self, phone_number, message):
         """Função principal para enviar mensagem via WhatsApp"""
         logger.info(f"Tentando enviar mensagem para: {phone_number}")
         
-        # Tentar primeiro com Twilio se configurado
-        if self.use_twilio:
-            success = self.send_with_twilio(phone_number, message)
-            if success:
-                self._log_message(phone_number, "whatsapp", message, success=True)
-                return True
-            else:
-                logger.warning("Falha ao enviar via Twilio, tentando método alternativo...")
+        if self.send_primary(phone_number, message):
+            return True
+        
+        return self.send_fallback(phone_number, message)
+    
+    def send_primary(self, phone_number, message):
+        """Tenta enviar apenas pelo transporte principal (Twilio)
+        
+        A falha só é registrada no histórico se não houver transporte alternativo.
         
-        # Tentar com pywhatkit como alternativa
-        success = self.send_with_pywhatkit(phone_number, message)
+        Permite que quem envia em paralelo deixe o método alternativo, que é lento,
+        para uma fila separada (ver delivery.DeliveryEngine).
+        """
+        if not self.transport:
+            return False
+        
+        success = self.send_with(self.transport, phone_number, message)
+        if success:
+            self._log_message(phone_number, "whatsapp", message, success=True)
+        elif self.fallback_transport:
+            logger.warning(f"Falha ao enviar via {self.transport.name}, tentando método alternativo...")
+        else:
+            self._log_failure(phone_number, message)
+        
+        return success
+    
+    def send_fallback(self, phone_number, message):
+        """Envia pelo transporte alternativo (pywhatkit), registrando o resultado final no histórico"""
+        if not self.fallback_transport:
+            if not self.transport:
+                self._log_failure(phone_number, message)
+            return False
+        
+        success = self.send_with(self.fallback_transport, phone_number, message)
         
         # Registrar o resultado no log
         if success:
             self._log_message(phone_number, "whatsapp", message, success=True)
         else:
-            error_msg = "Não foi possível enviar mensagem por nenhum método."
-            self._log_message(phone_number, "whatsapp", message, success=False, error=error_msg)
-            logger.error(error_msg)
+            self._log_failure(phone_number, message)
         
         return success
     
+    def _log_failure(self, phone_number, message):
+        error_msg = "Não foi possível enviar mensagem por nenhum método."
+        self._log_message(phone_number, "whatsapp", message, success=False, error=error_msg)
+        logger.error(error_msg)
+    
     def get_message_history(self, phone_number):
         """Obtém o histórico de mensagens enviadas para um número"""
-        return self.message_logs.get(phone_number, [])
+        return self.message_log.history(phone_number)
 
 # Para testes
 if __name__ == "__main__":